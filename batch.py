@@ -0,0 +1,202 @@
+# Description: Headless batch runner. Processes many file 1 / file 2 pairs, listed in a manifest
+# or found with a directory glob, across a pool of worker processes, writes the outputs of every
+# pair into its own folder and a roll-up status report, and exits with a meaningful code.
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import output_writer
+import run_report
+import summarize_and_merge
+
+# Exit codes
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_NO_PAIRS = 2
+
+REPORT_FILE = 'batch_report.json'
+
+MANIFEST_COLUMNS = ['file_path1', 'file_path2', 'sheet_name']
+
+def load_manifest(manifest_path, output_root):
+    # CSV with the columns file_path1, file_path2, sheet_name and optionally name and output_folder;
+    # relative paths are taken relative to the manifest. Raises ValueError on a malformed manifest
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    pairs = []
+    with open(manifest_path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        missing = [column for column in MANIFEST_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Manifest {manifest_path} lacks the columns {', '.join(missing)}")
+        for i, row in enumerate(reader, start=1):
+            empty = [column for column in MANIFEST_COLUMNS if not row.get(column)]
+            if empty:
+                raise ValueError(f"Row {i} of manifest {manifest_path} has no {', '.join(empty)}")
+            name = row.get('name') or f'pair_{i}'
+            pairs.append({
+                'name': name,
+                'file_path1': os.path.join(base, row['file_path1']),
+                'file_path2': os.path.join(base, row['file_path2']),
+                'sheet_name': row['sheet_name'],
+                'output_folder': os.path.join(base, row['output_folder']) if row.get('output_folder') else os.path.join(output_root, name),
+            })
+    return pairs
+
+def pair_names(folders):
+    # The directory names, or, when two directories share a name (e.g. exports/*/latest), their
+    # paths below the common parent, so that every pair gets its own output folder
+    names = [os.path.basename(os.path.normpath(folder)) for folder in folders]
+    if len(set(names)) == len(names):
+        return names
+    folders = [os.path.abspath(folder) for folder in folders]
+    common = os.path.commonpath(folders)
+    return [os.path.relpath(folder, common) if folder != common else os.path.basename(common) for folder in folders]
+
+def find_pairs(pattern, file1_pattern, file2_pattern, sheet_name, output_root):
+    # Every directory matching pattern holds one pair; its files are found with file1_pattern and file2_pattern
+    pairs = []
+    folders = sorted(path for path in glob.glob(pattern) if os.path.isdir(path))
+    for folder, name in zip(folders, pair_names(folders)):
+        files1 = sorted(glob.glob(os.path.join(folder, file1_pattern)))
+        files2 = sorted(glob.glob(os.path.join(folder, file2_pattern)))
+        pair = {
+            'name': name,
+            'file_path1': files1[0] if len(files1) == 1 else None,
+            'file_path2': files2[0] if len(files2) == 1 else None,
+            'sheet_name': sheet_name,
+            'output_folder': os.path.join(output_root, name),
+        }
+        if len(files1) != 1 or len(files2) != 1:
+            pair['error'] = f"Expected one file 1 and one file 2 in {folder}, found {len(files1)} and {len(files2)}"
+        pairs.append(pair)
+    return pairs
+
+def pair_result(pair):
+    return {key: pair[key] for key in ('name', 'file_path1', 'file_path2', 'sheet_name', 'output_folder')}
+
+def run_pair(pair, options):
+    # Runs one pair in a worker process; failures are reported, not raised, so one bad pair does not stop the batch
+    result = pair_result(pair)
+    start = time.perf_counter()
+    if pair.get('error'):
+        result.update(status='failed', error=pair['error'], seconds=0.0)
+        return result
+    try:
+        os.makedirs(pair['output_folder'], exist_ok=True)
+        found = summarize_and_merge.main(pair['file_path1'], pair['file_path2'], pair['sheet_name'], pair['output_folder'], **options)
+        result['status'] = 'ok' if found else 'nothing_found'
+        result['run_report'] = os.path.join(pair['output_folder'], run_report.REPORT_FILE)
+    except Exception as e:
+        result.update(status='failed', error=f'{type(e).__name__}: {e}', traceback=traceback.format_exc())
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    return result
+
+def run_isolated(pair, options):
+    # One pair in a worker process of its own, reported as failed if that process dies
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        try:
+            return executor.submit(run_pair, pair, options).result()
+        except BrokenProcessPool as e:
+            return {**pair_result(pair), 'status': 'failed', 'error': f"The worker process died: {e}", 'seconds': round(time.perf_counter() - start, 3)}
+
+def run_batch(pairs, options, workers=None):
+    if workers == 1:
+        return [run_pair(pair, options) for pair in pairs]
+    results = [None] * len(pairs)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_pair, pair, options): i for i, pair in enumerate(pairs)}
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except BrokenProcessPool:
+                pass
+    # A worker process that dies (e.g. killed by the OOM killer) breaks the whole pool; the pairs it
+    # left without a result are run again one by one, so only the pair that kills its worker fails
+    return [result if result is not None else run_isolated(pair, options) for pair, result in zip(pairs, results)]
+
+def write_report(results, output_root, seconds):
+    counts = {status: sum(result['status'] == status for result in results) for status in ('ok', 'nothing_found', 'failed')}
+    report = {'pairs': len(results), **counts, 'seconds': round(seconds, 3), 'results': results}
+    os.makedirs(output_root, exist_ok=True)
+    path = os.path.join(output_root, REPORT_FILE)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path, counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the merge and summary over many file 1 / file 2 pairs without the GUI.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--manifest', help="CSV with the columns file_path1, file_path2, sheet_name and optionally name and output_folder")
+    source.add_argument('--glob', help="Glob of directories that each hold one file 1 / file 2 pair")
+    parser.add_argument('--file1-pattern', default='*file1*.xlsx', help="Pattern of file 1 inside each --glob directory (default: %(default)s)")
+    parser.add_argument('--file2-pattern', default='*file2*.xlsx', help="Pattern of file 2 inside each --glob directory (default: %(default)s)")
+    parser.add_argument('--sheet-name', help="Sheet of file 1 to read, required with --glob")
+    parser.add_argument('--output-root', default='batch_output', help="Folder for the per-pair outputs and the report (default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Number of worker processes (default: number of CPUs)")
+    parser.add_argument('--engine', help="Excel reader engine, e.g. openpyxl or calamine")
+    parser.add_argument('--no-cache', action='store_true', help="Always parse the Excel files, bypassing the sheet cache")
+    parser.add_argument('--streaming', action='store_true', help="Stream the second Excel file row by row, keeping only the SR IDs of the first file")
+    parser.add_argument('--incremental', action='store_true', help="Only reprocess the SR IDs that changed since the previous incremental run of each pair")
+    parser.add_argument('--output-format', nargs='+', choices=output_writer.FORMATS, default=['xlsx'], help="Output formats to write (default: xlsx)")
+    parser.add_argument('--streaming-output', action='store_true', help="Write the Excel output row by row in constant memory")
+    parser.add_argument('--trace-memory', action='store_true', help="Also record the tracemalloc peak of every stage in the run reports (slower)")
+    parser.add_argument('--profile', action='store_true', help="Save a cProfile dump of every stage to each pair's output folder")
+    parser.add_argument('--read-workers', type=int, help="Worker processes parsing the sheets of each pair's second file (default: parse them in the pair's own process)")
+    args = parser.parse_args(argv)
+
+    if args.glob and not args.sheet_name:
+        parser.error("--sheet-name is required with --glob")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.read_workers is not None and args.read_workers < 1:
+        parser.error("--read-workers must be at least 1")
+
+    if args.manifest:
+        try:
+            pairs = load_manifest(args.manifest, args.output_root)
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        pairs = find_pairs(args.glob, args.file1_pattern, args.file2_pattern, args.sheet_name, args.output_root)
+    if not pairs:
+        print("No file pairs found.", file=sys.stderr)
+        return EXIT_NO_PAIRS
+
+    # Pairs writing to the same folder would overwrite each other's results, report and incremental state
+    folder_counts = Counter(os.path.abspath(pair['output_folder']) for pair in pairs)
+    shared = sorted(folder for folder, count in folder_counts.items() if count > 1)
+    if shared:
+        parser.error(f"Several pairs would write to the same output folder: {', '.join(shared)}")
+
+    options = {
+        'engine': args.engine,
+        'use_cache': not args.no_cache,
+        'incremental': args.incremental,
+        'streaming': args.streaming,
+        'output_formats': args.output_format,
+        'streaming_output': args.streaming_output,
+        'trace_memory': args.trace_memory,
+        'profile': args.profile,
+        'read_workers': args.read_workers,
+    }
+    start = time.perf_counter()
+    results = run_batch(pairs, options, min(args.workers, len(pairs)))
+    path, counts = write_report(results, args.output_root, time.perf_counter() - start)
+
+    for result in results:
+        print(f"{result['name']}: {result['status']}" + (f" ({result['error']})" if result.get('error') else ''))
+    print(f"{len(results)} pairs: {counts['ok']} ok, {counts['nothing_found']} nothing found, {counts['failed']} failed. Report saved to {path}")
+    return EXIT_FAILED if counts['failed'] else EXIT_OK
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+# Description: Seeded generator of synthetic file 1 / file 2 workbooks with the sheet layouts
+# summarize_and_merge expects, for benchmarking the merge/summary pipeline at any size.
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import output_writer
+import schema
+import summarize_and_merge
+
+WORK_TYPES = ['ΑΥΤΟΨΙΑ FTTH', 'ΚΑΤΑΣΚΕΥΗ FTTH', 'ΒΛΑΒΗ FTTH', 'ΜΕΤΑΦΟΡΑ FTTH']
+STATUSES = ['Ανοιχτή', 'Σε εξέλιξη', 'Ολοκληρωμένη', 'Ακυρωμένη']
+CATEGORIES = ['Νέα σύνδεση', 'Αναβάθμιση', 'Μεταφορά']
+STREETS = ['Ερμού', 'Σταδίου', 'Πανεπιστημίου', 'Αθηνάς', 'Πειραιώς', 'Κηφισίας', 'Αλεξάνδρας', 'Πατησίων']
+PEOPLE = [f'{first} {last}' for first in ['Γιώργος', 'Μαρία', 'Νίκος', 'Ελένη', 'Κώστας', 'Άννα'] for last in ['Παπαδόπουλος', 'Ιωάννου', 'Γεωργίου', 'Νικολάου']]
+TECHNICIANS = [f'Τεχνικός {i:02d}' for i in range(30)]
+ASSIGNMENT_TYPES = ['FTTH', 'FTTB', 'FTTC']
+PILOTS = ['ΝΑΙ', 'ΟΧΙ']
+BEP_TYPES = ['BEP', 'FB', 'BCP']
+FIELD_TASK_TYPES = ['LAST DROP', 'PILOT', 'AS-BUILT']
+FIELD_TASK_STATUSES = ['COMPLETED', 'OPEN', 'CANCELLED']
+
+START_DATE = np.datetime64('2024-01-01T08:00:00')
+
+def dates(rng, n, missing_share=0.0):
+    values = START_DATE + rng.integers(0, 365 * 24 * 60, n).astype('timedelta64[m]')
+    values = pd.Series(values)
+    if missing_share:
+        values[rng.random(n) < missing_share] = pd.NaT
+    return values
+
+def as_text(values, date_format):
+    # Some exports store the dates as text, here in the first format the schema declares
+    return values.dt.strftime(date_format).astype(object).where(values.notna(), None)
+
+def with_text_dates(df, sheet_schema):
+    return df.assign(**{column: as_text(df[column], kind[1]) for column, kind in sheet_schema.items() if schema.is_date(kind)})
+
+def with_missing(rng, values, missing_share):
+    values = pd.Series(values, dtype=object)
+    values[rng.random(len(values)) < missing_share] = None
+    return values
+
+def pick(rng, choices, n):
+    return np.asarray(choices, dtype=object)[rng.integers(0, len(choices), n)]
+
+def file2_sr_ids(rng, file1_ids, n, match_ratio, prefix, numeric_id_share):
+    # A match_ratio share of the rows reuse SR IDs of file 1, the rest are SR IDs file 1 does not
+    # have; of those a numeric_id_share are 11-digit numbers, longer than any numeric file 1 ID
+    matched = rng.random(n) < match_ratio
+    numeric = rng.random(n) < numeric_id_share
+    sr_ids = np.array([int(number) if is_numeric else f'{prefix}-{number % 10 ** 9:09d}' for number, is_numeric in zip(rng.integers(10 ** 10, 10 ** 11, n), numeric)], dtype=object)
+    sr_ids[matched] = file1_ids[rng.integers(0, len(file1_ids), matched.sum())]
+    return sr_ids
+
+def generate_file1(rng, rows, duplicates, numeric_id_share):
+    # rows rows over rows - duplicates SR IDs: the first duplicates SR IDs get a second row. A
+    # numeric_id_share of the SR IDs are numbers (1, 2, ... so of every width up to the row count),
+    # the others text like the exports' '1-000000159'
+    numeric = rng.random(rows - duplicates) < numeric_id_share
+    unique_ids = np.array([i + 1 if is_numeric else f'1-{i:09d}' for i, is_numeric in enumerate(numeric)], dtype=object)
+    sr_ids = np.concatenate([unique_ids, unique_ids[:duplicates]])
+    rng.shuffle(sr_ids)
+    return pd.DataFrame({
+        'SR ID': sr_ids,
+        'Τύπος εργασίας': pick(rng, WORK_TYPES, rows),
+        'Ημ/νία Αίτησης': dates(rng, rows),
+        'Όνομα': pick(rng, PEOPLE, rows),
+        'Τεχνικός σε Ανάθεση (KAM)': pick(rng, TECHNICIANS, rows),
+        'Κατάσταση': pick(rng, STATUSES, rows),
+        'Ημερομηνία Ολοκλήρωσης': dates(rng, rows, missing_share=0.5),
+        'Τ.Τ.Λ.Π.': rng.integers(10000, 85000, rows),
+        'Διεύθυνση πελάτη': pick(rng, STREETS, rows),
+        'Αριθμός Οδού': rng.integers(1, 200, rows),
+        'Έναρξη Ραντεβού': dates(rng, rows, missing_share=0.2),
+        'Έγκριση Εργασίας': pick(rng, ['ΝΑΙ', 'ΟΧΙ'], rows),
+        'Κατηγορία Αιτήματος': pick(rng, CATEGORIES, rows),
+    })[summarize_and_merge.FILE1_COLUMNS]
+
+def generate_assignments(rng, file1_ids, n, match_ratio, numeric_id_share):
+    phones = [f'69{i:08d}' for i in rng.integers(0, 10 ** 8, n)]
+    return pd.DataFrame({
+        'SR ID': file2_sr_ids(rng, file1_ids, n, match_ratio, '2', numeric_id_share),
+        'AGE': with_missing(rng, rng.integers(0, 120, n), 0.1),
+        'TYPE': pick(rng, ASSIGNMENT_TYPES, n),
+        'ΤΗΛΕΦΩΝΟ ΠΑΡΑΓΓΕΛΙΑΣ': [f'21{i:08d}' for i in rng.integers(0, 10 ** 8, n)],
+        'ADDRESS': with_missing(rng, [f'{street} {number}' for street, number in zip(pick(rng, STREETS, n), rng.integers(1, 200, n))], 0.1),
+        'FLOOR': rng.integers(0, 8, n),
+        'PILOT': with_missing(rng, pick(rng, PILOTS, n), 0.3),
+        'A/K': rng.integers(1000, 9999, n),
+        'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ': with_missing(rng, pick(rng, PEOPLE, n), 0.1),
+        'ΚΙΝΗΤΟ ΠΕΛΑΤΗ': with_missing(rng, phones, 0.1),
+        'ΣΤΑΘΕΡΟ ΠΕΛΑΤΗ': with_missing(rng, [f'21{i:08d}' for i in rng.integers(0, 10 ** 8, n)], 0.3),
+        'E-MAIL ΠΕΛΑΤΗ': with_missing(rng, [f'customer{i}@example.com' for i in rng.integers(0, 10 ** 6, n)], 0.3),
+        'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΔΙΑΧΕΙΡΙΣΤΗ': with_missing(rng, pick(rng, PEOPLE, n), 0.5),
+        'ΚΙΝΗΤΟ ΔΙΑΧΕΙΡΙΣΤΗ': with_missing(rng, [f'69{i:08d}' for i in rng.integers(0, 10 ** 8, n)], 0.5),
+        'ΣΤΑΘΕΡΟ ΔΙΑΧΕΙΡΙΣΤΗ': with_missing(rng, [f'21{i:08d}' for i in rng.integers(0, 10 ** 8, n)], 0.6),
+        'E-MAIL ΔΙΑΧΕΙΡΙΣΤΗ': with_missing(rng, [f'manager{i}@example.com' for i in rng.integers(0, 10 ** 6, n)], 0.6),
+        'CREATED': dates(rng, n),
+        'BUILDING ID': with_missing(rng, [f'B{i:07d}' for i in rng.integers(0, 10 ** 6, n)], 0.1),
+        'BEP/FB CODE': [f'BEP{i:06d}' for i in rng.integers(0, 10 ** 5, n)],
+        'BEP/FB PORT': rng.integers(1, 17, n),
+        'BEP/FB TYPE': pick(rng, BEP_TYPES, n),
+    })[summarize_and_merge.ASSIGNMENT_COLUMNS]
+
+def generate_new_flow(rng, file1_ids, n, match_ratio, numeric_id_share):
+    return pd.DataFrame({
+        'SR ID': file2_sr_ids(rng, file1_ids, n, match_ratio, '3', numeric_id_share),
+        'sr_created': dates(rng, n, missing_share=0.1),
+        'FIELDTASKTYPE': pick(rng, FIELD_TASK_TYPES, n),
+        'FIELDTASKSTATUS': pick(rng, FIELD_TASK_STATUSES, n),
+        'AGE': rng.integers(0, 120, n),
+        'pilot': pick(rng, PILOTS, n),
+        'full_adr': [f'{street} {number}' for street, number in zip(pick(rng, STREETS, n), rng.integers(1, 200, n))],
+        'customer': pick(rng, PEOPLE, n),
+        'mobile': [f'69{i:08d}' for i in rng.integers(0, 10 ** 8, n)],
+        'building Id': [f'B{i:07d}' for i in rng.integers(0, 10 ** 6, n)],
+    })[summarize_and_merge.NEW_FLOW_COLUMNS]
+
+def generate_frames(rows, match_ratio=0.5, duplicate_share=0.2, last_drop_share=0.1, seed=0, text_dates=False, numeric_id_share=0.5):
+    # file 1 gets rows rows, a duplicate_share of them repeating an SR ID; file 2 gets rows rows in
+    # total, a last_drop_share of them in 'New flow' and the rest spread evenly over the three
+    # assignment sheets. Dates are Excel dates, or text in DATE_FORMAT with text_dates (which the
+    # original implementation cannot read). A numeric_id_share of the SR IDs are numbers of
+    # varying width, the others text
+    if not 0 <= duplicate_share < 1:
+        raise ValueError("duplicate_share must be at least 0 and below 1")
+    if not 0 <= numeric_id_share <= 1:
+        raise ValueError("numeric_id_share must be between 0 and 1")
+    rng = np.random.default_rng(seed)
+    df1 = generate_file1(rng, rows, int(rows * duplicate_share), numeric_id_share)
+    file1_ids = df1['SR ID'].unique()
+
+    new_flow_rows = int(rows * last_drop_share)
+    assignment_rows = (rows - new_flow_rows) // 3
+    file2_sheets = {}
+    for sheet_name in summarize_and_merge.FILE2_SHEETS:
+        if sheet_name == 'New flow':
+            file2_sheets[sheet_name] = generate_new_flow(rng, file1_ids, new_flow_rows, match_ratio, numeric_id_share)
+        else:
+            file2_sheets[sheet_name] = generate_assignments(rng, file1_ids, assignment_rows, match_ratio, numeric_id_share)
+    if text_dates:
+        df1 = with_text_dates(df1, schema.FILE1_SCHEMA)
+        file2_sheets = {sheet_name: with_text_dates(df, summarize_and_merge.FILE2_SCHEMAS[sheet_name]) for sheet_name, df in file2_sheets.items()}
+    return df1, file2_sheets
+
+def perturb(df1, file2_sheets, share=0.01, seed=1):
+    # A copy with a share of the rows changed or removed, like the difference between two daily exports
+    rng = np.random.default_rng(seed)
+    df1 = df1.copy()
+    changed = rng.random(len(df1)) < share
+    df1.loc[changed, 'Κατάσταση'] = pick(rng, STATUSES, changed.sum())
+    file2_sheets = {sheet_name: df[rng.random(len(df)) >= share].reset_index(drop=True) for sheet_name, df in file2_sheets.items()}
+    return df1, file2_sheets
+
+def write_workbooks(df1, file2_sheets, folder, sheet_name='Sheet1'):
+    # Written with the streaming writer, so even the 1M-row workbooks are generated in constant memory
+    os.makedirs(folder, exist_ok=True)
+    file_path1 = os.path.join(folder, 'file1.xlsx')
+    file_path2 = os.path.join(folder, 'file2.xlsx')
+    output_writer.stream_excel({sheet_name: df1}, file_path1)
+    output_writer.stream_excel(file2_sheets, file_path2)
+    return file_path1, file_path2
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic file 1 / file 2 workbooks.")
+    parser.add_argument('folder', help="Folder to write file1.xlsx and file2.xlsx to")
+    parser.add_argument('--rows', type=int, default=10000, help="Rows of file 1 and of file 2 (default: %(default)s)")
+    parser.add_argument('--match-ratio', type=float, default=0.5, help="Share of file 2 rows whose SR ID is in file 1 (default: %(default)s)")
+    parser.add_argument('--duplicate-share', type=float, default=0.2, help="Share of the file 1 rows that repeat an SR ID (default: %(default)s)")
+    parser.add_argument('--last-drop-share', type=float, default=0.1, help="Share of file 2 rows in the 'New flow' sheet (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--text-dates', action='store_true', help="Store the dates as text in DATE_FORMAT instead of as Excel dates")
+    parser.add_argument('--numeric-id-share', type=float, default=0.5, help="Share of the SR IDs that are numbers of varying width instead of text (default: %(default)s)")
+    args = parser.parse_args()
+
+    df1, file2_sheets = generate_frames(args.rows, args.match_ratio, args.duplicate_share, args.last_drop_share, args.seed, args.text_dates, args.numeric_id_share)
+    print(*write_workbooks(df1, file2_sheets, args.folder))
@@ -0,0 +1,374 @@
+# Description: Benchmark suite of the merge/summary pipeline. Generates synthetic workbooks at
+# each size, runs summarize_and_merge end to end in a fresh process, collects the per-stage
+# timings and memory of its run report, flags regressions against stored baselines and checks
+# that the default path produces the same output as the original implementation, and the faster
+# code paths (streaming read, sheet cache, streaming output, incremental runs) the same output
+# as the default path.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import generate_workbooks
+import incremental_state
+import output_writer
+import reference
+import run_report
+import schema
+import summarize_and_merge
+import workbook_loader
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(os.path.dirname(BENCHMARKS_DIR), 'summarize_and_merge.py')
+SHEET_NAME = 'Sheet1'
+
+SIZES = [10000, 100000, 1000000]
+BASELINES_FILE = os.path.join(BENCHMARKS_DIR, 'baselines.json')
+RESULTS_FILE = 'benchmark_results.json'
+
+# Exit codes
+EXIT_OK = 0
+EXIT_REGRESSION = 1
+EXIT_MISMATCH = 2
+
+# Differences smaller than these are noise, whatever the relative change
+MIN_SECONDS = 0.05
+MIN_MB = 20
+
+# Faster code paths and the summarize_and_merge options that select them
+VARIANTS = {
+    'streaming read': ['--streaming'],
+    'cached read': [],
+    'streaming output': ['--streaming-output'],
+    'incremental': ['--incremental'],
+}
+
+def workbooks(work_dir, rows, match_ratio, duplicate_share, last_drop_share, seed, text_dates, numeric_id_share):
+    # Generated once per set of parameters and reused by later runs
+    folder = os.path.join(work_dir, f"rows{rows}_match{match_ratio}_dup{duplicate_share}_lastdrop{last_drop_share}_numeric{numeric_id_share}_seed{seed}{'_textdates' if text_dates else ''}")
+    paths = [os.path.join(folder, name) for name in ('file1.xlsx', 'file2.xlsx', 'previous/file1.xlsx', 'previous/file2.xlsx')]
+    if not all(os.path.exists(path) for path in paths):
+        print(f"Generating {rows} row workbooks in {folder}")
+        df1, file2_sheets = generate_workbooks.generate_frames(rows, match_ratio, duplicate_share, last_drop_share, seed, text_dates, numeric_id_share)
+        generate_workbooks.write_workbooks(df1, file2_sheets, folder, SHEET_NAME)
+        # The previous export of the incremental check: the same data with a few rows changed or removed
+        generate_workbooks.write_workbooks(*generate_workbooks.perturb(df1, file2_sheets, seed=seed + 1), os.path.join(folder, 'previous'), SHEET_NAME)
+    return paths
+
+def run(file_path1, file_path2, output_folder, options, cache_dir):
+    # One end-to-end run in a fresh process, so the peak memory of every run is its own
+    os.makedirs(output_folder, exist_ok=True)
+    env = dict(os.environ, EXCEL_MERGER_CACHE_DIR=cache_dir)
+    subprocess.run([sys.executable, SCRIPT, file_path1, file_path2, SHEET_NAME, output_folder, *options], env=env, check=True, stdout=subprocess.DEVNULL)
+    with open(os.path.join(output_folder, run_report.REPORT_FILE), encoding='utf-8') as f:
+        report = json.load(f)
+    if report.get('status') == 'failed':
+        raise RuntimeError(f"Run in {output_folder} failed: {report.get('error')}")
+    return report
+
+def measure(file_path1, file_path2, output_folder, repeat, trace_memory):
+    # The fastest of repeat runs of every stage, as the least disturbed by the rest of the machine
+    options = ['--no-cache'] + (['--trace-memory'] if trace_memory else [])
+    runs = [run(file_path1, file_path2, output_folder, options, os.path.join(output_folder, 'cache')) for _ in range(repeat)]
+    stages = {}
+    for report in runs:
+        for record in report['stages'] + [{'name': 'total', **report['total']}]:
+            best = stages.setdefault(record['name'], dict(record))
+            for key in ('wall_seconds', 'cpu_seconds', 'child_cpu_seconds', 'rss_change_mb', 'peak_rss_mb', 'child_peak_rss_mb', 'tracemalloc_peak_mb'):
+                if record.get(key) is not None:
+                    best[key] = record[key] if best.get(key) is None else min(best[key], record[key])
+    return {name: {key: value for key, value in record.items() if key not in ('name', 'profile')} for name, record in stages.items()}
+
+def memory_keys(stage):
+    # The peak resident memory of the process, and of its largest worker process, is that of the
+    # whole run so far, so it is only compared for the whole run; a stage's own memory is its
+    # tracemalloc peak, when recorded with --trace-memory
+    return ['peak_rss_mb', 'child_peak_rss_mb'] if stage == 'total' else ['tracemalloc_peak_mb']
+
+def compare(results, baselines, tolerance, memory_tolerance):
+    # Stages that are slower or use more memory than their baseline by more than the tolerance
+    regressions = []
+    for size, stages in results.items():
+        for stage, record in stages.items():
+            baseline = baselines.get(size, {}).get(stage)
+            if not baseline:
+                continue
+            for key, relative, minimum in [('wall_seconds', tolerance, MIN_SECONDS)] + [(key, memory_tolerance, MIN_MB) for key in memory_keys(stage)]:
+                new, old = record.get(key), baseline.get(key)
+                if new is None or old is None:
+                    continue
+                if new > old * (1 + relative) and new - old > minimum:
+                    regressions.append(f"{size} rows, {stage}: {key} {old} -> {new} (+{(new / old - 1) * 100 if old else float('inf'):.0f}%)")
+    return regressions
+
+def read_output(output_folder):
+    return pd.read_excel(os.path.join(output_folder, f'{output_writer.RESULTS_NAME}.xlsx'), sheet_name=None)
+
+def differences(expected, actual):
+    found = []
+    if list(expected) != list(actual):
+        return [f"sheets {list(expected)} != {list(actual)}"]
+    for sheet_name, expected_df in expected.items():
+        try:
+            pd.testing.assert_frame_equal(expected_df, actual[sheet_name], check_dtype=False)
+        except AssertionError as e:
+            found.append(f"{sheet_name}: {str(e).splitlines()[0]}")
+    return found
+
+def tied_keys(file_path1, file_path2):
+    # The (SR ID, 'Τύπος εργασίας') pairs with several rows at their latest 'Ημ/νία Αίτησης'; the
+    # original kept an arbitrary one of them, with its unstable sort
+    df1 = workbook_loader.read_sheets(file_path1, {SHEET_NAME: summarize_and_merge.FILE1_COLUMNS}, use_cache=False, schemas={SHEET_NAME: schema.FILE1_SCHEMA})[SHEET_NAME]
+    file2_sheets = workbook_loader.read_sheets(file_path2, summarize_and_merge.FILE2_SHEETS, use_cache=False, schemas=summarize_and_merge.FILE2_SCHEMAS)
+    final_df = summarize_and_merge.join_file1(summarize_and_merge.match_file2(df1, file2_sheets), df1)
+    keys = final_df[['SR ID', 'Τύπος εργασίας']].astype(object)
+    latest = final_df.groupby([keys['SR ID'], keys['Τύπος εργασίας']])['Ημ/νία Αίτησης'].transform('max')
+    at_latest = keys[final_df['Ημ/νία Αίτησης'] == latest]
+    return set(at_latest[at_latest.duplicated(keep=False)].itertuples(index=False, name=None))
+
+def in_row_order(df):
+    # The rows of df sorted by their text, to compare sheets whose row order is not defined
+    return df.iloc[df.astype(str).apply(tuple, axis=1).argsort(kind='stable')].reset_index(drop=True)
+
+def aggregated_differences(expected_df, actual_df, ties):
+    # 'Aggregated Data' as the original defines it: the same rows in any order, sorted by date; of
+    # a tied SR ID and work type only the key and date are compared, since the original picked
+    # any of the tied rows
+    if list(expected_df.columns) != list(actual_df.columns):
+        return [f"Aggregated Data: columns {list(expected_df.columns)} != {list(actual_df.columns)}"]
+    found = []
+    if expected_df['Ημ/νία Αίτησης'].tolist() != actual_df['Ημ/νία Αίτησης'].tolist():
+        found.append("Aggregated Data: the rows are not in the same 'Ημ/νία Αίτησης' order")
+    compared = []
+    for df in (expected_df, actual_df):
+        df = df.astype(object)
+        tied = [(schema.id_text(sr_id), work_type) in ties for sr_id, work_type in zip(df['SR ID'], df['Τύπος εργασίας'])]
+        df.loc[tied, [column for column in df.columns if column not in ('SR ID', 'Τύπος εργασίας', 'Ημ/νία Αίτησης')]] = None
+        compared.append(in_row_order(df))
+    try:
+        pd.testing.assert_frame_equal(*compared, check_dtype=False)
+    except AssertionError as e:
+        found.append(f"Aggregated Data: {str(e).splitlines()[0]}")
+    return found
+
+def check_reference(file_path1, file_path2, default_folder, output_folder):
+    # The default path must write what the original row-by-row implementation writes, up to the
+    # row order and tie choices the original left undefined in 'Aggregated Data'
+    os.makedirs(output_folder, exist_ok=True)
+    file_path1, file_path2, output_folder = (os.path.abspath(path) for path in (file_path1, file_path2, output_folder))
+    # The original writes nothing_found.xlsx to the working directory
+    cwd = os.getcwd()
+    os.chdir(output_folder)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            reference.main(file_path1, file_path2, SHEET_NAME, output_folder)
+    finally:
+        os.chdir(cwd)
+
+    expected, actual = read_output(output_folder), read_output(default_folder)
+    if list(expected) != list(actual):
+        found = [f"sheets {list(expected)} != {list(actual)}"]
+    else:
+        found = aggregated_differences(expected.pop('Aggregated Data'), actual.pop('Aggregated Data'), tied_keys(file_path1, file_path2))
+        found += differences(expected, actual)
+    print(f"  original implementation: {'identical' if not found else 'DIFFERENT'}")
+    return found
+
+def check_variants(file_path1, file_path2, previous_path1, previous_path2, output_folder, with_reference=True):
+    # The default path must write the same sheets as the original implementation, and every faster
+    # code path the same sheets as the default path
+    cache_dir = os.path.join(output_folder, 'cache')
+    default_folder = os.path.join(output_folder, 'default')
+    run(file_path1, file_path2, default_folder, ['--no-cache'], cache_dir)
+    expected = read_output(default_folder)
+
+    mismatches = {}
+    if with_reference:
+        found = check_reference(file_path1, file_path2, default_folder, os.path.join(output_folder, 'original_implementation'))
+        if found:
+            mismatches['original implementation'] = found
+    for variant, options in VARIANTS.items():
+        folder = os.path.join(output_folder, variant.replace(' ', '_'))
+        if variant == 'cached read':
+            # The first run fills the cache, the second one reads from it
+            run(file_path1, file_path2, folder, options, cache_dir)
+        elif variant == 'incremental':
+            # Start from the previous export, then process the changed SR IDs of the current one
+            state = os.path.join(folder, incremental_state.STATE_FILE)
+            if os.path.exists(state):
+                os.remove(state)
+            run(previous_path1, previous_path2, folder, options + ['--no-cache'], cache_dir)
+            options = options + ['--no-cache']
+        report = run(file_path1, file_path2, folder, options, cache_dir)
+        found = differences(expected, read_output(folder))
+        if variant == 'incremental' and 'incremental splice' not in [record['name'] for record in report['stages']]:
+            found.append("the incremental run rebuilt everything instead of splicing")
+        if found:
+            mismatches[variant] = found
+        print(f"  {variant}: {'identical' if not found else 'DIFFERENT'}")
+    return mismatches
+
+def build_typed(df1, file2_sheets):
+    # The written sheets of the pipeline, for frames typed as read from the workbooks
+    df1 = schema.apply_schema(df1, schema.FILE1_SCHEMA)
+    file2_sheets = {sheet_name: schema.apply_schema(df, summarize_and_merge.FILE2_SCHEMAS[sheet_name]) for sheet_name, df in file2_sheets.items()}
+    sheets = summarize_and_merge.build_sheets(df1, file2_sheets)
+    return dict(zip(['Aggregated Data', 'Summary of Actions', 'Last Drop'], [schema.ids_to_values(df) for df in sheets]))
+
+def check_mixed_ids(rows=200, seed=0):
+    # IDs stored as numbers in one sheet and as text in another, or next to a text cell in the
+    # same sheet, must match exactly as if every ID were a number
+    df1, file2_sheets = generate_workbooks.generate_frames(rows, seed=seed, numeric_id_share=1)
+    expected = build_typed(df1, file2_sheets)
+
+    first_sheet = next(iter(file2_sheets))
+    with_text_cell = pd.concat([file2_sheets[first_sheet].astype({'SR ID': object}), file2_sheets[first_sheet].head(1).assign(**{'SR ID': 'N/A'})], ignore_index=True)
+    cases = {
+        "text cell in a file 2 sheet": (df1, {**file2_sheets, first_sheet: with_text_cell}),
+        "file 1 IDs stored as text": (df1.assign(**{'SR ID': df1['SR ID'].astype(str)}), file2_sheets),
+        "file 2 IDs stored as decimals": (df1, {sheet_name: df.astype({'SR ID': float}) for sheet_name, df in file2_sheets.items()}),
+    }
+    mismatches = {}
+    for case, (case_df1, case_sheets) in cases.items():
+        try:
+            found = differences(expected, build_typed(case_df1, case_sheets))
+        except Exception as e:
+            found = [f"{type(e).__name__}: {e}"]
+        if found:
+            mismatches[case] = found
+        print(f"  {case}: {'identical' if not found else 'DIFFERENT'}")
+    return mismatches
+
+def check_padded_streaming(work_dir, rows=200, seed=0):
+    # Numeric SR IDs in file 1 and zero-padded text ones ('000123') in file 2: the parser reads the
+    # padded text as numbers, so the streaming read must match the same rows as the default path
+    folder = os.path.join(work_dir, f'padded_ids_rows{rows}_seed{seed}')
+    shutil.rmtree(folder, ignore_errors=True)
+    df1, file2_sheets = generate_workbooks.generate_frames(rows, seed=seed, numeric_id_share=1)
+    padded = lambda df: df.assign(**{'SR ID': df['SR ID'].astype(str).str.zfill(12)})
+    generate_workbooks.write_workbooks(df1, {sheet_name: padded(df) for sheet_name, df in file2_sheets.items()}, folder, SHEET_NAME)
+    file_path1, file_path2 = os.path.join(folder, 'file1.xlsx'), os.path.join(folder, 'file2.xlsx')
+
+    cache_dir = os.path.join(folder, 'cache')
+    default_folder, streaming_folder = os.path.join(folder, 'default'), os.path.join(folder, 'streaming')
+    run(file_path1, file_path2, default_folder, ['--no-cache'], cache_dir)
+    run(file_path1, file_path2, streaming_folder, ['--no-cache', '--streaming'], cache_dir)
+    results = lambda output_folder: os.path.exists(os.path.join(output_folder, f'{output_writer.RESULTS_NAME}.xlsx'))
+    if not results(default_folder):
+        found = ["the default path matched no zero-padded SR ID"]
+    elif not results(streaming_folder):
+        found = ["the streaming read matched no zero-padded SR ID"]
+    else:
+        found = differences(read_output(default_folder), read_output(streaming_folder))
+    print(f"  streaming read, zero-padded IDs: {'identical' if not found else 'DIFFERENT'}")
+    return {'streaming read, zero-padded IDs': found} if found else {}
+
+def print_results(size, stages, baselines):
+    print(f"{size} rows")
+    # 'cpu s' includes the worker processes, 'RSS +MB' is the change of the resident memory over the
+    # stage, 'peak MB' the peak of the process so far and 'worker MB' that of its largest worker
+    print(f"  {'stage':<24}{'rows':>10}{'wall s':>10}{'cpu s':>10}{'RSS +MB':>10}{'peak MB':>10}{'worker MB':>10}{'baseline s':>12}")
+    for stage, record in stages.items():
+        baseline = baselines.get(size, {}).get(stage, {}).get('wall_seconds')
+        values = [record.get(key) for key in ('rows', 'wall_seconds', 'cpu_seconds', 'rss_change_mb', 'peak_rss_mb', 'child_peak_rss_mb')] + [baseline]
+        print(f"  {stage:<24}" + ''.join(f"{'' if value is None else value:>{width}}" for value, width in zip(values, (10, 10, 10, 10, 10, 10, 12))))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the merge and summary pipeline on synthetic workbooks.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="Rows of file 1 and of file 2 to benchmark (default: %(default)s)")
+    parser.add_argument('--match-ratio', type=float, default=0.5, help="Share of file 2 rows whose SR ID is in file 1 (default: %(default)s)")
+    parser.add_argument('--duplicate-share', type=float, default=0.2, help="Share of the file 1 rows that repeat an SR ID (default: %(default)s)")
+    parser.add_argument('--last-drop-share', type=float, default=0.1, help="Share of file 2 rows in the 'New flow' sheet (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--text-dates', action='store_true', help="Store the dates as text in DATE_FORMAT; the original implementation cannot read them, so it is not checked")
+    parser.add_argument('--numeric-id-share', type=float, default=0.5, help="Share of the SR IDs that are numbers of varying width instead of text (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per size; the fastest of them is reported (default: %(default)s)")
+    parser.add_argument('--trace-memory', action='store_true', help="Also record the tracemalloc peak of every stage (slower)")
+    parser.add_argument('--work-dir', default=os.path.join(BENCHMARKS_DIR, 'work'), help="Folder for the generated workbooks and the outputs (default: benchmarks/work)")
+    parser.add_argument('--baselines', default=BASELINES_FILE, help="Stored baselines to compare with (default: benchmarks/baselines.json)")
+    parser.add_argument('--update-baselines', action='store_true', help="Store the results of this run as the new baselines")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed relative slowdown of a stage (default: %(default)s)")
+    parser.add_argument('--memory-tolerance', type=float, default=0.2, help="Allowed relative growth of the peak memory (default: %(default)s)")
+    parser.add_argument('--check-max-rows', type=int, default=100000, help="Largest size at which the faster code paths are checked against the default one (default: %(default)s)")
+    parser.add_argument('--reference-max-rows', type=int, default=10000, help="Largest size at which the original row-by-row implementation is run as reference (default: %(default)s)")
+    parser.add_argument('--skip-checks', action='store_true', help="Only measure, without checking the output")
+    args = parser.parse_args(argv)
+
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    if not 0 <= args.duplicate_share < 1:
+        parser.error("--duplicate-share must be at least 0 and below 1")
+    if not 0 <= args.numeric_id_share <= 1:
+        parser.error("--numeric-id-share must be between 0 and 1")
+
+    baselines = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines, encoding='utf-8') as f:
+            baselines = json.load(f)['sizes']
+
+    results, mismatches = {}, {}
+    start = time.perf_counter()
+    if not args.skip_checks:
+        print("Checking mixed numeric and text IDs")
+        found = {**check_mixed_ids(seed=args.seed), **check_padded_streaming(args.work_dir, seed=args.seed)}
+        if found:
+            mismatches['mixed IDs'] = found
+    for rows in args.sizes:
+        size = str(rows)
+        file_path1, file_path2, previous_path1, previous_path2 = workbooks(args.work_dir, rows, args.match_ratio, args.duplicate_share, args.last_drop_share, args.seed, args.text_dates, args.numeric_id_share)
+        output_folder = os.path.join(args.work_dir, 'output', size)
+        results[size] = measure(file_path1, file_path2, os.path.join(output_folder, 'measure'), args.repeat, args.trace_memory)
+        print_results(size, results[size], baselines)
+        if not args.skip_checks and rows <= args.check_max_rows:
+            with_reference = not args.text_dates and rows <= args.reference_max_rows
+            print("Checking the output" + ("" if with_reference else " (without the original implementation)"))
+            found = check_variants(file_path1, file_path2, previous_path1, previous_path2, os.path.join(output_folder, 'variants'), with_reference)
+            if found:
+                mismatches[size] = found
+
+    regressions = compare(results, baselines, args.tolerance, args.memory_tolerance)
+    summary = {
+        'parameters': {'match_ratio': args.match_ratio, 'duplicate_share': args.duplicate_share, 'last_drop_share': args.last_drop_share, 'seed': args.seed,
+                       'text_dates': args.text_dates, 'numeric_id_share': args.numeric_id_share, 'repeat': args.repeat},
+        'machine': {'platform': platform.platform(), 'python': platform.python_version(), 'pandas': pd.__version__, 'cpus': os.cpu_count()},
+        'sizes': results,
+        'regressions': regressions,
+        'mismatches': mismatches,
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+    os.makedirs(args.work_dir, exist_ok=True)
+    with open(os.path.join(args.work_dir, RESULTS_FILE), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    if args.update_baselines:
+        # Sizes not benchmarked in this run keep their previous baselines
+        with open(args.baselines, 'w', encoding='utf-8') as f:
+            json.dump({'machine': summary['machine'], 'parameters': summary['parameters'], 'sizes': {**baselines, **results}}, f, ensure_ascii=False, indent=2)
+        print(f"Baselines saved to {args.baselines}")
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    for size, found in mismatches.items():
+        for variant, problems in found.items():
+            for problem in problems:
+                print(f"MISMATCH {size if size == 'mixed IDs' else f'{size} rows'}, {variant}: {problem}")
+    if mismatches:
+        return EXIT_MISMATCH
+    if regressions:
+        return EXIT_REGRESSION
+    print("No regressions" + ("" if baselines or args.update_baselines else " (no baselines stored yet, run with --update-baselines)"))
+    return EXIT_OK
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+# Description: State kept between incremental runs. For every input sheet a hash of the rows
+# of each SR ID is stored together with the produced sheets, so that the next run only has to
+# merge and summarize the SR IDs that were added, changed or removed, and splice them into
+# the previous output.
+
+import os
+import pickle
+
+import pandas as pd
+
+import schema
+
+STATE_FILE = '.final_results_state.pkl'
+
+# Bump when the state layout or the way the sheets are built changes, to force a full rebuild
+STATE_VERSION = 4
+
+def sr_id_hashes(df):
+    # One hash per SR ID over its rows; the position of each row within its SR ID is part of
+    # the hash, since the summaries take the first row of every SR ID
+    row_hashes = pd.util.hash_pandas_object(df, index=False)
+    position = df.groupby('SR ID', sort=False).cumcount()
+    keyed = pd.DataFrame({'row': row_hashes.to_numpy(), 'position': position.to_numpy()})
+    return pd.util.hash_pandas_object(keyed, index=False).groupby(df['SR ID'].to_numpy()).sum()
+
+def changed_sr_ids(old_hashes, new_hashes):
+    changed = set()
+    for old, new in zip(old_hashes, new_hashes):
+        changed.update(old.index.symmetric_difference(new.index))
+        common = old.index.intersection(new.index)
+        differs = old.loc[common].to_numpy() != new.loc[common].to_numpy()
+        changed.update(common[differs])
+    return pd.Index(list(changed))
+
+def sr_id_order(df1, file2_frames):
+    # The order in which SR IDs first appear in the merged data, which is the row order of the summaries
+    sr_ids = pd.concat([df['SR ID'] for df in file2_frames], ignore_index=True)
+    return pd.Index(sr_ids[sr_ids.isin(df1['SR ID'])].unique())
+
+def splice(previous_sheets, new_sheets, changed_ids, order, sort_data):
+    # Replace the rows of the changed SR IDs in the previous sheets with the newly built ones;
+    # sort_data puts the 'Aggregated Data' rows in the order of a full run
+    if previous_sheets is None:
+        return new_sheets
+
+    spliced = []
+    for i, previous_df in enumerate(previous_sheets):
+        frames = [previous_df[~previous_df['SR ID'].isin(changed_ids)]] if 'SR ID' in previous_df else []
+        if new_sheets is not None:
+            frames.append(new_sheets[i])
+        # Empty frames would only change the column dtypes of the concatenation
+        frames = [df for df in frames if not df.empty] or frames[:1]
+        spliced.append(pd.concat(schema.unify_missing(frames), ignore_index=True) if frames else pd.DataFrame())
+
+    data_df, summary_df, last_drop_df = spliced
+    if data_df.empty:
+        return None
+
+    data_df = sort_data(data_df).reset_index(drop=True)
+    summary_df, last_drop_df = [
+        df.iloc[order.get_indexer(df['SR ID']).argsort(kind='stable')].reset_index(drop=True) if 'SR ID' in df else df
+        for df in (summary_df, last_drop_df)
+    ]
+    return data_df, summary_df, last_drop_df
+
+def load(output_folder, sheet_name):
+    # Returns the state of the previous run, or None if a full rebuild is needed
+    path = os.path.join(output_folder, STATE_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+    except Exception:
+        return None
+    if state.get('version') != STATE_VERSION or state.get('sheet_name') != sheet_name:
+        return None
+    return state
+
+def save(output_folder, sheet_name, hashes, sheets):
+    path = os.path.join(output_folder, STATE_FILE)
+    state = {'version': STATE_VERSION, 'sheet_name': sheet_name, 'hashes': hashes, 'sheets': sheets}
+    with open(path + '.tmp', 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + '.tmp', path)
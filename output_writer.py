@@ -0,0 +1,92 @@
+# Description: Writes the 'Aggregated Data', 'Summary of Actions' and 'Last Drop' sheets.
+# Besides the default pandas Excel writer there is a constant-memory Excel mode that streams
+# the rows to disk with openpyxl's write-only workbook, and CSV and Parquet outputs for
+# downstream systems that never open Excel.
+
+import os
+
+import pandas as pd
+from openpyxl import Workbook
+
+FORMATS = ['xlsx', 'csv', 'parquet']
+
+RESULTS_NAME = 'final_results'
+NOTHING_FOUND_NAME = 'nothing_found'
+
+# Rows converted to Python values at a time by the streaming Excel writer
+CHUNK_ROWS = 10000
+
+def table_name(sheet_name):
+    # 'Summary of Actions' -> 'summary_of_actions', used for the CSV and Parquet file names
+    return sheet_name.lower().replace(' ', '_')
+
+def stream_excel(sheets, path):
+    # Write-only workbooks keep only the current row in memory and flush it to disk
+    workbook = Workbook(write_only=True)
+    for sheet_name, df in sheets.items():
+        worksheet = workbook.create_sheet(sheet_name)
+        if len(df.columns):
+            worksheet.append([str(column) for column in df.columns])
+        for start in range(0, len(df), CHUNK_ROWS):
+            chunk = df.iloc[start:start + CHUNK_ROWS].astype(object)
+            # Missing values (NaN, NaT, None) are left as empty cells, as pandas' to_excel does
+            for row in chunk.where(chunk.notna(), None).itertuples(index=False, name=None):
+                worksheet.append(row)
+    workbook.save(path)
+
+def write_parquet(df, path):
+    try:
+        df.to_parquet(path, index=False)
+    except ImportError as e:
+        raise ImportError("Parquet output needs pyarrow: pip install pyarrow") from e
+    except (TypeError, ValueError):
+        # Arrow needs one type per column; write mixed-type text columns as strings
+        mixed = {column: df[column].map(lambda value: value if pd.isna(value) else str(value)) for column in df.columns if df[column].dtype == object}
+        df.assign(**mixed).to_parquet(path, index=False)
+
+def write_sheets(sheets, output_folder, name=RESULTS_NAME, output_formats=('xlsx',), streaming_output=False):
+    # sheets maps each sheet name to its DataFrame; returns the paths written
+    paths = []
+    for output_format in output_formats:
+        if output_format == 'xlsx':
+            path = os.path.join(output_folder, f'{name}.xlsx')
+            if streaming_output:
+                stream_excel(sheets, path)
+            else:
+                with pd.ExcelWriter(path) as writer:
+                    for sheet_name, df in sheets.items():
+                        df.to_excel(writer, sheet_name=sheet_name, index=False)
+            paths.append(path)
+        elif output_format in ('csv', 'parquet'):
+            for sheet_name, df in sheets.items():
+                path = os.path.join(output_folder, f'{name}_{table_name(sheet_name)}.{output_format}')
+                if output_format == 'csv':
+                    # utf-8-sig so that Excel also reads the Greek text of the CSV files correctly
+                    df.to_csv(path, index=False, encoding='utf-8-sig')
+                else:
+                    write_parquet(df, path)
+                paths.append(path)
+        else:
+            raise ValueError(f"Unknown output format '{output_format}', expected one of {FORMATS}")
+    return paths
+
+def write_results(data_df, summary_df, last_drop_df, output_folder, output_formats=('xlsx',), streaming_output=False):
+    sheets = {'Aggregated Data': data_df, 'Summary of Actions': summary_df, 'Last Drop': last_drop_df}
+    return write_sheets(sheets, output_folder, RESULTS_NAME, output_formats, streaming_output)
+
+def write_nothing_found(output_folder, output_formats=('xlsx',), streaming_output=False):
+    # An empty marker output in every requested format
+    paths = []
+    for output_format in output_formats:
+        if output_format == 'xlsx':
+            paths += write_sheets({'Sheet1': pd.DataFrame()}, output_folder, NOTHING_FOUND_NAME, ['xlsx'], streaming_output)
+        else:
+            path = os.path.join(output_folder, f'{NOTHING_FOUND_NAME}.{output_format}')
+            if output_format == 'csv':
+                pd.DataFrame().to_csv(path, index=False)
+            elif output_format == 'parquet':
+                write_parquet(pd.DataFrame(), path)
+            else:
+                raise ValueError(f"Unknown output format '{output_format}', expected one of {FORMATS}")
+            paths.append(path)
+    return paths
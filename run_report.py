@@ -0,0 +1,137 @@
+# Description: Per-stage instrumentation of a run. Every named stage records its wall time,
+# CPU time (including its worker processes), row count, how much the resident memory of the
+# process changed over the stage, the peak memory of the process and of its largest worker
+# process so far, optionally its tracemalloc peak and a cProfile dump,
+# and the whole run is saved as a JSON report next to the results so runs can be compared
+# across nights.
+
+import cProfile
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import openpyxl
+import pandas as pd
+
+REPORT_FILE = 'run_report.json'
+
+def peak_rss_bytes():
+    # Peak resident memory of the process so far, or None where it cannot be measured
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return getattr(psutil.Process().memory_info(), 'peak_wset', None)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # macOS reports bytes, Linux kilobytes
+
+def children_usage():
+    # CPU seconds of the finished child processes (e.g. the workers parsing the sheets of file 2)
+    # and the peak resident memory of the largest of them, or (None, None) where not available
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    peak = usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+    return usage.ru_utime + usage.ru_stime, peak
+
+def child_cpu_since(start_child_cpu):
+    child_cpu = children_usage()[0]
+    return child_cpu - start_child_cpu if child_cpu is not None else 0.0
+
+def current_rss_bytes():
+    # Resident memory of the process right now, or None where it cannot be measured
+    try:
+        import psutil
+    except ImportError:
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, AttributeError):
+            return None
+    return psutil.Process().memory_info().rss
+
+def to_mb(value):
+    return None if value is None else round(value / 1024 ** 2, 1)
+
+class RunReport:
+    def __init__(self, trace_memory=False, profile_dir=None):
+        self.trace_memory = trace_memory
+        self.profile_dir = profile_dir
+        self.stages = []
+        self.info = {}
+        self.started = datetime.now().astimezone()
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        self.start_child_cpu = children_usage()[0] or 0.0
+        # Only stop tracemalloc at the end if this report started it
+        self.owns_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self.owns_tracing:
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name):
+        # Yields the stage's record, so the stage can add its row count with record['rows'] = ...
+        record = {'name': name, 'rows': None}
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        profiler = cProfile.Profile() if self.profile_dir else None
+        start_rss = current_rss_bytes()
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        start_child_cpu = children_usage()[0] or 0.0
+        if profiler:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler:
+                profiler.disable()
+                os.makedirs(self.profile_dir, exist_ok=True)
+                record['profile'] = os.path.join(self.profile_dir, f"{len(self.stages):02d}_{name.replace(' ', '_')}.prof")
+                profiler.dump_stats(record['profile'])
+            record['wall_seconds'] = round(time.perf_counter() - start_wall, 4)
+            # Worker processes are only counted once they have exited, which the pools do by the
+            # end of the stage that started them
+            child_cpu = child_cpu_since(start_child_cpu)
+            record['cpu_seconds'] = round(time.process_time() - start_cpu + child_cpu, 4)
+            record['child_cpu_seconds'] = round(child_cpu, 4)
+            # The peak is that of the whole process so far; only the change belongs to this stage
+            end_rss = current_rss_bytes()
+            record['rss_change_mb'] = to_mb(end_rss - start_rss) if start_rss is not None and end_rss is not None else None
+            record['peak_rss_mb'] = to_mb(peak_rss_bytes())
+            record['child_peak_rss_mb'] = to_mb(children_usage()[1])
+            if self.trace_memory:
+                record['tracemalloc_peak_mb'] = to_mb(tracemalloc.get_traced_memory()[1])
+            self.stages.append(record)
+
+    def to_dict(self):
+        return {
+            'started': self.started.isoformat(timespec='seconds'),
+            **self.info,
+            'stages': self.stages,
+            'total': {
+                'wall_seconds': round(time.perf_counter() - self.start_wall, 4),
+                'cpu_seconds': round(time.process_time() - self.start_cpu + child_cpu_since(self.start_child_cpu), 4),
+                'child_cpu_seconds': round(child_cpu_since(self.start_child_cpu), 4),
+                'peak_rss_mb': to_mb(peak_rss_bytes()),
+                'child_peak_rss_mb': to_mb(children_usage()[1]),
+            },
+            'versions': {'python': platform.python_version(), 'pandas': pd.__version__, 'openpyxl': openpyxl.__version__},
+        }
+
+    def save(self, output_folder):
+        path = os.path.join(output_folder, REPORT_FILE)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2, default=str)
+        if self.owns_tracing:
+            tracemalloc.stop()
+        return path
@@ -0,0 +1,136 @@
+# Description: Declarative schemas of the input sheets. The heavily repeated text columns are
+# loaded as categoricals, the ID columns as one canonical nullable string type and the date
+# columns are converted with an explicit format, all right after parsing, so every later stage
+# (filters, merge, dedup, Excel write) works on compact typed columns.
+
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype, union_categoricals
+
+# Default format of the dates stored as text; dates stored as Excel dates are already parsed
+DATE_FORMAT = '%d/%m/%Y %H:%M:%S'
+
+def date(*date_formats):
+    # A date column whose text dates are in one of date_formats, tried in order
+    return ('date', *(date_formats or (DATE_FORMAT,)))
+
+def is_date(kind):
+    return isinstance(kind, tuple) and kind[0] == 'date'
+
+CATEGORY = 'category'
+ID = 'id'
+DATE = date()
+
+FILE1_SCHEMA = {
+    'SR ID': ID,
+    'Τύπος εργασίας': CATEGORY,
+    'Ημ/νία Αίτησης': DATE,
+    'Τεχνικός σε Ανάθεση (KAM)': CATEGORY,
+    'Κατάσταση': CATEGORY,
+}
+
+ASSIGNMENT_SCHEMA = {
+    'SR ID': ID,
+    'TYPE': CATEGORY,
+    'PILOT': CATEGORY,
+    'CREATED': DATE,
+    'BUILDING ID': ID,
+    'BEP/FB TYPE': CATEGORY,
+}
+
+NEW_FLOW_SCHEMA = {
+    'SR ID': ID,
+    'sr_created': DATE,
+    'FIELDTASKTYPE': CATEGORY,
+    'FIELDTASKSTATUS': CATEGORY,
+    'building Id': ID,
+}
+
+ID_COLUMNS = sorted({column for sheet_schema in (FILE1_SCHEMA, ASSIGNMENT_SCHEMA, NEW_FLOW_SCHEMA) for column, kind in sheet_schema.items() if kind == ID})
+
+# Canonical text of a whole number, as written back to the outputs; longer IDs stay text since
+# they do not fit an Int64
+INTEGER_TEXT = r'-?(0|[1-9][0-9]{0,17})'
+
+def id_text(value):
+    # 101.0 from a numeric cell and '101' from a text cell are the same ID
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def to_id(column):
+    # Every ID column becomes a nullable string whatever the cells of its sheet hold, whole
+    # numbers written without decimals, so IDs of differently typed sheets compare and merge
+    if is_numeric_dtype(column) and column.dropna().mod(1).eq(0).all():
+        return column.astype('Int64').astype('string')
+    return column.map(id_text, na_action='ignore').astype('string')
+
+def from_id(column):
+    # The IDs as written to the outputs: integer text is a number again, as in the input
+    # workbooks, and anything else stays text
+    is_integer = column.str.fullmatch(INTEGER_TEXT).fillna(False).astype(bool)
+    numbers = column.where(is_integer).astype('Int64')
+    if (is_integer | column.isna()).all():
+        return numbers
+    return column.astype(object).where(~is_integer, numbers.astype(object))
+
+def id_sort_key(column):
+    # Sorts integer text in numeric order by zero-padding it to one width
+    width = column.str.len().max()
+    return column if pd.isna(width) else column.str.zfill(int(width))
+
+def to_date(column, date_formats):
+    # Like read_excel's parse_dates, a column that parses in none of the formats is left as it
+    # was; unparsed_dates reports it
+    for date_format in date_formats:
+        try:
+            return pd.to_datetime(column, format=date_format)
+        except (ValueError, TypeError):
+            pass
+    return column
+
+def unparsed_dates(df, schema):
+    # The declared date columns of a typed sheet that did not parse and are still text
+    return [column for column, kind in schema.items() if is_date(kind) and column in df and not is_datetime64_any_dtype(df[column])]
+
+def apply_schema(df, schema):
+    converted = {}
+    for column, kind in schema.items():
+        if column not in df:
+            continue
+        if kind == CATEGORY:
+            converted[column] = df[column].astype('category')
+        elif kind == ID:
+            converted[column] = to_id(df[column])
+        else:
+            converted[column] = to_date(df[column], kind[1:])
+    return df.assign(**converted)
+
+def ids_to_values(df):
+    # from_id over the ID columns of an output sheet
+    return df.assign(**{column: from_id(df[column]) for column in ID_COLUMNS if column in df and df[column].dtype == 'string'})
+
+def unify_categories(frames):
+    # Give each categorical column the same categories in every frame, so concatenating
+    # the frames keeps it categorical instead of falling back to object
+    frames = list(frames)
+    columns = {column for df in frames for column in df.columns if isinstance(df[column].dtype, pd.CategoricalDtype)}
+    for column in columns:
+        present = [df[column] for df in frames if column in df]
+        if not all(isinstance(values.dtype, pd.CategoricalDtype) for values in present):
+            continue
+        categories = union_categoricals(present, ignore_order=True).categories
+        frames = [df.assign(**{column: df[column].cat.set_categories(categories)}) if column in df else df for df in frames]
+    return frames
+
+def unify_missing(frames):
+    # Give a column that is all missing in some frames the dtype it has in the frames with values,
+    # the dtype concatenating the frames gives it, without relying on the deprecated exclusion of
+    # all-NA columns from the dtype of the concatenation
+    frames = list(frames)
+    columns = {column for df in frames for column in df.columns}
+    for column in columns:
+        filled = [df[column].dtype for df in frames if column in df and df[column].notna().any()]
+        if not filled:
+            continue
+        frames = [df.assign(**{column: df[column].astype(filled[0])}) if column in df and df[column].dtype != filled[0] and df[column].isna().all() else df for df in frames]
+    return frames
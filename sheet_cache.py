@@ -0,0 +1,96 @@
+# Description: Local on-disk cache of parsed Excel sheets, so that reruns against the same
+# exports skip the slow Excel parse. Entries are keyed on the content hash of the workbook,
+# the sheet name, the selected columns and the reader engine, stored as Feather files
+# (or pickles when pyarrow is missing or a column cannot be stored as Arrow) and evicted
+# least recently used first once the cache grows past its size cap.
+
+import hashlib
+import os
+import pickle
+
+import pandas as pd
+
+CACHE_DIR = os.environ.get('EXCEL_MERGER_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'excel-data-merger'))
+MAX_CACHE_BYTES = int(os.environ.get('EXCEL_MERGER_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+
+# Bump when the cached format or the parsed content changes, to invalidate old entries
+CACHE_VERSION = 2
+
+def file_key(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def entry_key(workbook_key, sheet_name, usecols, engine, sheet_schema=None):
+    key = repr((CACHE_VERSION, workbook_key, sheet_name, list(usecols or []), engine, sorted((sheet_schema or {}).items())))
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+def entry_paths(key, cache_dir=None):
+    cache_dir = cache_dir or CACHE_DIR
+    return os.path.join(cache_dir, key + '.feather'), os.path.join(cache_dir, key + '.pkl')
+
+def load(key, cache_dir=None):
+    for path in entry_paths(key, cache_dir):
+        if not os.path.exists(path):
+            continue
+        try:
+            if path.endswith('.feather'):
+                df = pd.read_feather(path)
+            else:
+                with open(path, 'rb') as f:
+                    df = pickle.load(f)
+        except Exception:
+            # A truncated or unreadable entry is treated as a miss and parsed again
+            os.remove(path)
+            continue
+        os.utime(path)  # Mark as recently used for the LRU eviction
+        return df
+    return None
+
+def store(key, df, cache_dir=None, max_bytes=None):
+    cache_dir = cache_dir or CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    feather_path, pickle_path = entry_paths(key, cache_dir)
+    # Temporary names are per process, since batch runs may store the same sheet concurrently
+    suffix = f'.{os.getpid()}.tmp'
+    try:
+        df.to_feather(feather_path + suffix)
+        os.replace(feather_path + suffix, feather_path)
+    except (ImportError, TypeError, ValueError):
+        # No pyarrow, or mixed-type columns Arrow cannot hold
+        if os.path.exists(feather_path + suffix):
+            os.remove(feather_path + suffix)
+        with open(pickle_path + suffix, 'wb') as f:
+            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(pickle_path + suffix, pickle_path)
+    evict(cache_dir, max_bytes)
+
+def entries(cache_dir=None):
+    cache_dir = cache_dir or CACHE_DIR
+    if not os.path.isdir(cache_dir):
+        return []
+    return [entry for entry in os.scandir(cache_dir) if entry.is_file() and entry.name.endswith(('.feather', '.pkl'))]
+
+def evict(cache_dir=None, max_bytes=None):
+    max_bytes = MAX_CACHE_BYTES if max_bytes is None else max_bytes
+    cached = sorted(entries(cache_dir), key=lambda entry: entry.stat().st_mtime)
+    total = sum(entry.stat().st_size for entry in cached)
+    for entry in cached:
+        if total <= max_bytes:
+            break
+        total -= entry.stat().st_size
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass  # Already evicted by another process
+
+def clear(cache_dir=None):
+    cached = entries(cache_dir)
+    for entry in cached:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+    return len(cached)
@@ -10,218 +10,318 @@
 # The processed data is then saved into a new Excel file with multiple sheets: 
 # 'Aggregated Data', 'Summary of Actions', and 'Last Drop'. 
 
+import argparse
+import os
+
 import pandas as pd
 
+import incremental_state
+import output_writer
+import run_report
+import schema
+import sheet_cache
+import workbook_loader
+
+# Columns read from the first file and from the sheets of the second file
+FILE1_COLUMNS = ['SR ID', 'Τύπος εργασίας', 'Ημ/νία Αίτησης', 'Όνομα', 'Τεχνικός σε Ανάθεση (KAM)', 'Κατάσταση', 'Ημερομηνία Ολοκλήρωσης', 'Τ.Τ.Λ.Π.', 'Διεύθυνση πελάτη', 'Αριθμός Οδού', 'Έναρξη Ραντεβού', 'Έγκριση Εργασίας', 'Κατηγορία Αιτήματος']
+ASSIGNMENT_COLUMNS = ['SR ID', 'AGE', 'TYPE', 'ΤΗΛΕΦΩΝΟ ΠΑΡΑΓΓΕΛΙΑΣ', 'ADDRESS', 'FLOOR', 'PILOT', 'A/K', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ', 'ΚΙΝΗΤΟ ΠΕΛΑΤΗ', 'ΣΤΑΘΕΡΟ ΠΕΛΑΤΗ', 'E-MAIL ΠΕΛΑΤΗ', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΚΙΝΗΤΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΣΤΑΘΕΡΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'E-MAIL ΔΙΑΧΕΙΡΙΣΤΗ', 'CREATED', 'BUILDING ID', 'BEP/FB CODE', 'BEP/FB PORT', 'BEP/FB TYPE']
+NEW_FLOW_COLUMNS = ['SR ID', 'sr_created', 'FIELDTASKTYPE', 'FIELDTASKSTATUS', 'AGE', 'pilot', 'full_adr', 'customer', 'mobile', 'building Id']
+FILE2_SHEETS = {
+    'Ανατεθειμένα για κατασκευή': ASSIGNMENT_COLUMNS,
+    'Ανατεθειμένες αυτοψίες': ASSIGNMENT_COLUMNS,
+    'Εντολές στο ίδιο BID': ASSIGNMENT_COLUMNS,
+    'New flow': NEW_FLOW_COLUMNS,
+}
+FILE2_SCHEMAS = {
+    'Ανατεθειμένα για κατασκευή': schema.ASSIGNMENT_SCHEMA,
+    'Ανατεθειμένες αυτοψίες': schema.ASSIGNMENT_SCHEMA,
+    'Εντολές στο ίδιο BID': schema.ASSIGNMENT_SCHEMA,
+    'New flow': schema.NEW_FLOW_SCHEMA,
+}
+
+# Columns of the 'Aggregated Data' sheet
+AGGREGATED_COLUMNS = ['SR ID', 'Τύπος εργασίας', 'Ημ/νία Αίτησης', 'AGE', 'Όνομα', 'Τεχνικός σε Ανάθεση (KAM)', 'Κατάσταση', 'Ημερομηνία Ολοκλήρωσης', 'Τ.Τ.Λ.Π.', 'Διεύθυνση πελάτη', 'Αριθμός Οδού', 'Έναρξη Ραντεβού', 'Έγκριση Εργασίας', 'Κατηγορία Αιτήματος', 'TYPE', 'ΤΗΛΕΦΩΝΟ ΠΑΡΑΓΓΕΛΙΑΣ', 'FLOOR', 'PILOT', 'A/K', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ', 'ΚΙΝΗΤΟ ΠΕΛΑΤΗ', 'ΣΤΑΘΕΡΟ ΠΕΛΑΤΗ', 'E-MAIL ΠΕΛΑΤΗ', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΚΙΝΗΤΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΣΤΑΘΕΡΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'E-MAIL ΔΙΑΧΕΙΡΙΣΤΗ', 'CREATED', 'BUILDING ID', 'BEP/FB CODE', 'BEP/FB PORT', 'BEP/FB TYPE', 'sr_created', 'FIELDTASKTYPE', 'FIELDTASKSTATUS', 'full_adr', 'pilot', 'customer', 'mobile', 'building Id']
+
+# Row order of the 'Aggregated Data' sheet
+AGGREGATED_ORDER = ['Ημ/νία Αίτησης', 'SR ID', 'Τύπος εργασίας']
+
+# Column of the joined data telling which sheet of the second file a row came from
+SOURCE_COLUMN = 'source'
+
 def get_sheet_names(file_path):
-    return pd.ExcelFile(file_path).sheet_names
+    return workbook_loader.get_sheet_names(file_path)
+
+def coalesce(df, column, fallback):
+    # Take the value of column, falling back to the other sheet's spelling where it is missing
+    values, fallback_values = df[column], df[fallback]
+    if values.dtype != fallback_values.dtype or isinstance(values.dtype, pd.CategoricalDtype):
+        # Categoricals and differently typed columns cannot take each other's values in place
+        values, fallback_values = values.astype(object), fallback_values.astype(object)
+    return values.where(values.notna(), fallback_values)
+
+def first_per_sr_id(final_df, df1):
+    # One row per SR ID (its first appearance), together with the first matching row of the first file
+    first_df = final_df.drop_duplicates(subset='SR ID', keep='first')
+    df1_first = df1.drop_duplicates(subset='SR ID', keep='first').set_index('SR ID')
+    return first_df, df1_first
+
+def latest_action(final_df, action):
+    # For every SR ID, the first row of the given action type carrying its latest 'Ημ/νία Αίτησης'
+    action_df = final_df[final_df['Τύπος εργασίας'] == action]
+    latest_date = action_df.groupby('SR ID')['Ημ/νία Αίτησης'].transform('max')
+    return action_df[action_df['Ημ/νία Αίτησης'] == latest_date].drop_duplicates(subset='SR ID').set_index('SR ID')
+
+def build_last_drop(final_df, df1):
+    first_df, df1_first = first_per_sr_id(final_df, df1)
+    first_df = first_df[first_df['sr_created'].notna()] #Making sure to pass only the last drop entries
+    if first_df.empty:
+        return pd.DataFrame()
+
+    sr_ids = first_df['SR ID']
+    last_drop_df = pd.DataFrame({
+        'SR ID': sr_ids,
+        'PILOT': coalesce(first_df, 'PILOT', 'pilot'),
+        'BUILDING ID': coalesce(first_df, 'BUILDING ID', 'building Id'),
+        'ADDRESS': coalesce(first_df, 'ADDRESS', 'full_adr'),
+        'FLOOR': first_df['FLOOR'],
+        'AGE': first_df['AGE'],
+        'Ημερομηνία Εκτέλεσης (As-built)': first_df['sr_created'],
+        'Όνομα': sr_ids.map(df1_first['Όνομα']),
+        'Τεχνικός σε Ανάθεση (KAM)': sr_ids.map(df1_first['Τεχνικός σε Ανάθεση (KAM)']),
+        'Pilot/Last drop': first_df['FIELDTASKTYPE'],
+        'Κατάσταση (As-built)': first_df['FIELDTASKSTATUS'],
+        'As-built/Απολογισμός': None,
+        'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ': coalesce(first_df, 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ', 'customer'),
+        'ΚΙΝΗΤΟ ΠΕΛΑΤΗ': coalesce(first_df, 'ΚΙΝΗΤΟ ΠΕΛΑΤΗ', 'mobile'),
+    })
+    return last_drop_df.reset_index(drop=True)
+
+def build_summary(final_df, df1):
+    first_df, df1_first = first_per_sr_id(final_df, df1)
+    first_df = first_df[first_df['sr_created'].isna()] #Making sure to pass only the non-last drop entries
+    if first_df.empty:
+        return pd.DataFrame()
+
+    sr_ids = first_df['SR ID']
+    autopsia_df = latest_action(final_df, 'ΑΥΤΟΨΙΑ FTTH')
+    kataskevi_df = latest_action(final_df, 'ΚΑΤΑΣΚΕΥΗ FTTH')
+    summary_df = pd.DataFrame({
+        'SR ID': sr_ids,
+        'BUILDING ID': coalesce(first_df, 'BUILDING ID', 'building Id'),
+        'ADDRESS': coalesce(first_df, 'ADDRESS', 'full_adr'),
+        'FLOOR': first_df['FLOOR'],
+        'A/K': first_df['A/K'],
+        'AGE': first_df['AGE'],
+        'CREATED': first_df['CREATED'],
+        'Όνομα': sr_ids.map(df1_first['Όνομα']),
+        'Τεχνικός σε Ανάθεση (KAM)': sr_ids.map(df1_first['Τεχνικός σε Ανάθεση (KAM)']),
+        'Ημ/νία Αίτησης (ΑΥΤΟΨΙΑ)': sr_ids.map(autopsia_df['Ημ/νία Αίτησης']),
+        'Τύπος εργασίας (ΑΥΤΟΨΙΑ)': sr_ids.map(autopsia_df['Τύπος εργασίας']),
+        'Κατάσταση (ΑΥΤΟΨΙΑ)': sr_ids.map(autopsia_df['Κατάσταση']),
+        'Ημ/νία Αίτησης (ΚΑΤΑΣΚΕΥΗ)': sr_ids.map(kataskevi_df['Ημ/νία Αίτησης']),
+        'Τύπος εργασίας (ΚΑΤΑΣΚΕΥΗ)': sr_ids.map(kataskevi_df['Τύπος εργασίας']),
+        'Κατάσταση (ΚΑΤΑΣΚΕΥΗ)': sr_ids.map(kataskevi_df['Κατάσταση']),
+        'Ημερομηνία Εκτέλεσης (Χωματουργικές Εργασίες)': None,
+        'Κατάσταση (Χωματουργικές Εργασίες)': None,
+        'Ημερομηνία Εκτέλεσης (Δικτυακές Εργασίες)': None,
+        'Δικτυακές Εργασίες': None,
+        'Κατάσταση (Δικτυακές Εργασίες)': None,
+        # Here was the Pilot/As build and Last drop info
+        'Κατηγορία Αιτήματος': first_df['Κατηγορία Αιτήματος'],
+        'ΤΗΛΕΦΩΝΟ ΠΑΡΑΓΓΕΛΙΑΣ': first_df['ΤΗΛΕΦΩΝΟ ΠΑΡΑΓΓΕΛΙΑΣ'],
+        'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ': coalesce(first_df, 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ', 'customer'),
+        'ΚΙΝΗΤΟ ΠΕΛΑΤΗ': coalesce(first_df, 'ΚΙΝΗΤΟ ΠΕΛΑΤΗ', 'mobile'),
+        'ΣΤΑΘΕΡΟ ΠΕΛΑΤΗ': first_df['ΣΤΑΘΕΡΟ ΠΕΛΑΤΗ'],
+        'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΔΙΑΧΕΙΡΙΣΤΗ': first_df['ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΔΙΑΧΕΙΡΙΣΤΗ'],
+        'ΚΙΝΗΤΟ ΔΙΑΧΕΙΡΙΣΤΗ': first_df['ΚΙΝΗΤΟ ΔΙΑΧΕΙΡΙΣΤΗ'],
+        'ΣΤΑΘΕΡΟ ΔΙΑΧΕΙΡΙΣΤΗ': first_df['ΣΤΑΘΕΡΟ ΔΙΑΧΕΙΡΙΣΤΗ'],
+        'BEP/FB CODE': first_df['BEP/FB CODE'],
+        'BEP/FB PORT': first_df['BEP/FB PORT'],
+        'BEP/FB TYPE': first_df['BEP/FB TYPE'],
+    })
+    return summary_df.reset_index(drop=True)
+
+def match_file2(df1, file2_sheets):
+    # Keep the rows of the second file whose SR ID is in the first file, tagged with their sheet
+    # and aligned to one schema (the columns of all sheets, missing ones left empty)
+    sr_ids = pd.Index(df1['SR ID'].unique())
+    matched = [df[df['SR ID'].isin(sr_ids)].assign(**{SOURCE_COLUMN: sheet}) for sheet, df in file2_sheets.items()]
+    # Sheets without matches are left out of the concatenation, where they would only change the
+    # column dtypes, and their columns are added back empty; one is kept if none matched at all
+    frames = [df for df in matched if not df.empty] or matched[:1]
+    matched_df = pd.concat(schema.unify_categories(schema.unify_missing(frames)), ignore_index=True)
+    missing = {column: pd.Series(index=matched_df.index, dtype=df[column].dtype) for df in matched for column in df.columns if column not in matched_df}
+    return matched_df.assign(**missing)
 
-def main(file_path1, file_path2, sheet_name, output_folder):
+def join_file1(matched_df, df1):
+    # Merge the matched rows with the corresponding information from the first file
+    return pd.merge(matched_df, df1, on='SR ID')
+
+def aggregated_sort_key(column):
+    # Categoricals sort by their text and the canonical IDs in numeric order
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.astype(object)
+    if column.name == 'SR ID':
+        return schema.id_sort_key(column)
+    return column
+
+def sort_aggregated(data_df):
+    # 'SR ID' and 'Τύπος εργασίας' are unique after the dedup, so this order has no ties and a full
+    # and an incremental run write the rows in the same order
+    return data_df.sort_values(AGGREGATED_ORDER, kind='stable', key=aggregated_sort_key)
+
+def build_aggregated(final_df):
+    # Remove duplicate entries based on 'SR ID' and 'Τύπος εργασίας' columns, keeping the latest date.
+    # final_df is in sheet order and then row order of the second file, so among rows with the same
+    # date the stable sort keeps the one of the last sheet, and within it the last row
+    data_df = final_df[AGGREGATED_COLUMNS]
+    data_df = data_df.assign(**{'Ημ/νία Αίτησης': pd.to_datetime(data_df['Ημ/νία Αίτησης'])})
+    return sort_aggregated(data_df.sort_values('Ημ/νία Αίτησης', kind='stable').drop_duplicates(subset=['SR ID', 'Τύπος εργασίας'], keep='last'))
+
+def build_sheets(df1, file2_sheets, report=None):
+    # Returns the 'Aggregated Data', 'Summary of Actions' and 'Last Drop' sheets, or None if no SR ID matches
+    report = report or run_report.RunReport()
+    with report.stage('match') as stage:
+        matched_df = match_file2(df1, file2_sheets)
+        stage['rows'] = len(matched_df)
+    if matched_df.empty:
+        return None
+
+    # One joined frame feeds all three sheets
+    with report.stage('join') as stage:
+        final_df = join_file1(matched_df, df1)
+        stage['rows'] = len(final_df)
+    with report.stage('aggregated data') as stage:
+        data_df = build_aggregated(final_df)
+        stage['rows'] = len(data_df)
+
+    #Create the Last drop and Summary sheets
+    with report.stage('last drop') as stage:
+        last_drop_df = build_last_drop(final_df, df1)
+        stage['rows'] = len(last_drop_df)
+    with report.stage('summary') as stage:
+        summary_df = build_summary(final_df, df1)
+        stage['rows'] = len(summary_df)
+
+    return data_df, summary_df, last_drop_df
+
+def check_dates(sheets, schemas, report):
+    # A declared date column that parses in none of its formats stays text, and its latest dates
+    # would then be the last ones in text order; say so in the output and the run report
+    unparsed = {}
+    for sheet, df in sheets.items():
+        columns = schema.unparsed_dates(df, schemas[sheet])
+        if columns:
+            unparsed[sheet] = columns
+            print(f"Warning: the dates in {', '.join(repr(column) for column in columns)} of sheet '{sheet}' are not in the format of the schema and were left as text")
+    if unparsed:
+        report.info['unparsed_dates'] = unparsed
+
+def process_files(file_path1, file_path2, sheet_name, output_folder, report, engine=None, use_cache=True, incremental=False, streaming=False,
+                  output_formats=('xlsx',), streaming_output=False, read_workers=None):
     # Load the first Excel file
-    df1 = pd.read_excel(file_path1, sheet_name=sheet_name, usecols=['SR ID', 'Τύπος εργασίας', 'Ημ/νία Αίτησης', 'Όνομα', 'Τεχνικός σε Ανάθεση (KAM)', 'Κατάσταση', 'Ημερομηνία Ολοκλήρωσης', 'Τ.Τ.Λ.Π.', 'Διεύθυνση πελάτη', 'Αριθμός Οδού', 'Έναρξη Ραντεβού', 'Έγκριση Εργασίας', 'Κατηγορία Αιτήματος'])
+    with report.stage('read file 1') as stage:
+        df1 = workbook_loader.read_sheets(file_path1, {sheet_name: FILE1_COLUMNS}, engine=engine, use_cache=use_cache, schemas={sheet_name: schema.FILE1_SCHEMA})[sheet_name]
+        stage['rows'] = len(df1)
 
-    # Load the second Excel file
-    df2_construction = pd.read_excel(file_path2, sheet_name='Ανατεθειμένα για κατασκευή', usecols=['SR ID', 'AGE', 'TYPE', 'ΤΗΛΕΦΩΝΟ ΠΑΡΑΓΓΕΛΙΑΣ', 'ADDRESS', 'FLOOR', 'PILOT', 'A/K', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ', 'ΚΙΝΗΤΟ ΠΕΛΑΤΗ', 'ΣΤΑΘΕΡΟ ΠΕΛΑΤΗ', 'E-MAIL ΠΕΛΑΤΗ', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΚΙΝΗΤΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΣΤΑΘΕΡΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'E-MAIL ΔΙΑΧΕΙΡΙΣΤΗ', 'CREATED', 'BUILDING ID', 'BEP/FB CODE', 'BEP/FB PORT', 'BEP/FB TYPE'])
-    df2_inspection = pd.read_excel(file_path2, sheet_name='Ανατεθειμένες αυτοψίες', usecols=['SR ID', 'AGE', 'TYPE', 'ΤΗΛΕΦΩΝΟ ΠΑΡΑΓΓΕΛΙΑΣ', 'ADDRESS', 'FLOOR', 'PILOT', 'A/K', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ', 'ΚΙΝΗΤΟ ΠΕΛΑΤΗ', 'ΣΤΑΘΕΡΟ ΠΕΛΑΤΗ', 'E-MAIL ΠΕΛΑΤΗ', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΚΙΝΗΤΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΣΤΑΘΕΡΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'E-MAIL ΔΙΑΧΕΙΡΙΣΤΗ', 'CREATED', 'BUILDING ID', 'BEP/FB CODE', 'BEP/FB PORT', 'BEP/FB TYPE'])
-    df2_bid = pd.read_excel(file_path2, sheet_name='Εντολές στο ίδιο BID', usecols=['SR ID', 'AGE', 'TYPE', 'ΤΗΛΕΦΩΝΟ ΠΑΡΑΓΓΕΛΙΑΣ', 'ADDRESS', 'FLOOR', 'PILOT', 'A/K', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ', 'ΚΙΝΗΤΟ ΠΕΛΑΤΗ', 'ΣΤΑΘΕΡΟ ΠΕΛΑΤΗ', 'E-MAIL ΠΕΛΑΤΗ', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΚΙΝΗΤΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΣΤΑΘΕΡΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'E-MAIL ΔΙΑΧΕΙΡΙΣΤΗ', 'CREATED', 'BUILDING ID', 'BEP/FB CODE', 'BEP/FB PORT', 'BEP/FB TYPE'])
-    df2_new_flow = pd.read_excel(file_path2, sheet_name='New flow', usecols=['SR ID', 'sr_created', 'FIELDTASKTYPE', 'FIELDTASKSTATUS', 'AGE', 'pilot', 'full_adr', 'customer', 'mobile', 'building Id'])
+    # Load the second Excel file, either streaming only the rows of the SR IDs of the first file
+    # or parsing its four sheets, in read_workers worker processes when given
+    with report.stage('read file 2') as stage:
+        if streaming:
+            file2_sheets = workbook_loader.stream_sheets(file_path2, FILE2_SHEETS, df1['SR ID'].dropna().unique(), schemas=FILE2_SCHEMAS)
+        else:
+            file2_sheets = workbook_loader.read_sheets(file_path2, FILE2_SHEETS, engine=engine, max_workers=read_workers, use_cache=use_cache, schemas=FILE2_SCHEMAS)
+        stage['rows'] = sum(len(df) for df in file2_sheets.values())
+    check_dates({sheet_name: df1, **file2_sheets}, {sheet_name: schema.FILE1_SCHEMA, **FILE2_SCHEMAS}, report)
 
-    # Filter rows based on SR ID from the first file
-    filtered_construction = df2_construction[df2_construction['SR ID'].isin(df1['SR ID'])]
-    filtered_inspection = df2_inspection[df2_inspection['SR ID'].isin(df1['SR ID'])]
-    filtered_bid = df2_bid[df2_bid['SR ID'].isin(df1['SR ID'])]
-    filtered_new_flow = df2_new_flow[df2_new_flow['SR ID'].isin(df1['SR ID'])]
+    state = None
+    if incremental:
+        with report.stage('incremental hashes'):
+            hashes = [incremental_state.sr_id_hashes(df) for df in [df1, *file2_sheets.values()]]
+            state = incremental_state.load(output_folder, sheet_name)
+
+    if state is not None:
+        # Only the SR IDs added, changed or removed since the previous run are merged and summarized again
+        changed_ids = incremental_state.changed_sr_ids(state['hashes'], hashes)
+        print(f"Incremental run: {len(changed_ids)} SR IDs changed since the previous run")
+        changed_df1 = df1[df1['SR ID'].isin(changed_ids)]
+        changed_file2_sheets = {sheet: df[df['SR ID'].isin(changed_ids)] for sheet, df in file2_sheets.items()}
+        sheets = build_sheets(changed_df1, changed_file2_sheets, report)
+        with report.stage('incremental splice') as stage:
+            order = incremental_state.sr_id_order(df1, file2_sheets.values())
+            sheets = incremental_state.splice(state['sheets'], sheets, changed_ids, order, sort_aggregated)
+            stage['rows'] = len(changed_ids)
+    else:
+        sheets = build_sheets(df1, file2_sheets, report)
+
+    if incremental:
+        with report.stage('save incremental state'):
+            incremental_state.save(output_folder, sheet_name, hashes, sheets)
 
     # Check if there are no matching SR IDs
-    if filtered_construction.empty and filtered_inspection.empty and filtered_bid.empty and filtered_new_flow.empty:
+    if sheets is None:
         print("No matching SR IDs found.")
-        df_empty = pd.DataFrame()
-        df_empty.to_excel('nothing_found.xlsx', index=False)
+        with report.stage('write'):
+            report.info['outputs'] = output_writer.write_nothing_found(output_folder, output_formats, streaming_output)
+        return False
     else:
-        # Merge the filtered data with the corresponding information from the first file
-        merged_construction = pd.merge(filtered_construction, df1, left_on='SR ID', right_on='SR ID')
-        merged_inspection = pd.merge(filtered_inspection, df1, left_on='SR ID', right_on='SR ID')
-        merged_bid = pd.merge(filtered_bid, df1, left_on='SR ID', right_on='SR ID')
-        merged_new_flow = pd.merge(filtered_new_flow, df1, left_on='SR ID', right_on='SR ID')
-
-
-        # Prepare the final DataFrame
-        data_df = pd.concat([merged_construction[['SR ID', 'Τύπος εργασίας', 'Ημ/νία Αίτησης', 'AGE', 'Όνομα', 'Τεχνικός σε Ανάθεση (KAM)', 'Κατάσταση', 'Ημερομηνία Ολοκλήρωσης', 'Τ.Τ.Λ.Π.', 'Διεύθυνση πελάτη', 'Αριθμός Οδού', 'Έναρξη Ραντεβού', 'Έγκριση Εργασίας', 'Κατηγορία Αιτήματος', 'TYPE', 'ΤΗΛΕΦΩΝΟ ΠΑΡΑΓΓΕΛΙΑΣ', 'FLOOR', 'PILOT', 'A/K', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ', 'ΚΙΝΗΤΟ ΠΕΛΑΤΗ', 'ΣΤΑΘΕΡΟ ΠΕΛΑΤΗ', 'E-MAIL ΠΕΛΑΤΗ', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΚΙΝΗΤΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΣΤΑΘΕΡΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'E-MAIL ΔΙΑΧΕΙΡΙΣΤΗ', 'CREATED', 'BUILDING ID', 'BEP/FB CODE', 'BEP/FB PORT', 'BEP/FB TYPE']],
-                              merged_inspection[['SR ID', 'Τύπος εργασίας', 'Ημ/νία Αίτησης', 'AGE', 'Όνομα', 'Τεχνικός σε Ανάθεση (KAM)', 'Κατάσταση', 'Ημερομηνία Ολοκλήρωσης', 'Τ.Τ.Λ.Π.', 'Διεύθυνση πελάτη', 'Αριθμός Οδού', 'Έναρξη Ραντεβού', 'Έγκριση Εργασίας', 'Κατηγορία Αιτήματος', 'TYPE', 'ΤΗΛΕΦΩΝΟ ΠΑΡΑΓΓΕΛΙΑΣ', 'FLOOR', 'PILOT', 'A/K', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ', 'ΚΙΝΗΤΟ ΠΕΛΑΤΗ', 'ΣΤΑΘΕΡΟ ΠΕΛΑΤΗ', 'E-MAIL ΠΕΛΑΤΗ', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΚΙΝΗΤΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΣΤΑΘΕΡΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'E-MAIL ΔΙΑΧΕΙΡΙΣΤΗ', 'CREATED', 'BUILDING ID', 'BEP/FB CODE', 'BEP/FB PORT', 'BEP/FB TYPE']],
-                              merged_bid[['SR ID', 'Τύπος εργασίας', 'Ημ/νία Αίτησης', 'AGE', 'Όνομα', 'Τεχνικός σε Ανάθεση (KAM)', 'Κατάσταση', 'Ημερομηνία Ολοκλήρωσης', 'Τ.Τ.Λ.Π.', 'Διεύθυνση πελάτη', 'Αριθμός Οδού', 'Έναρξη Ραντεβού', 'Έγκριση Εργασίας', 'Κατηγορία Αιτήματος', 'TYPE', 'ΤΗΛΕΦΩΝΟ ΠΑΡΑΓΓΕΛΙΑΣ', 'FLOOR', 'PILOT', 'A/K', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ', 'ΚΙΝΗΤΟ ΠΕΛΑΤΗ', 'ΣΤΑΘΕΡΟ ΠΕΛΑΤΗ', 'E-MAIL ΠΕΛΑΤΗ', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΚΙΝΗΤΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΣΤΑΘΕΡΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'E-MAIL ΔΙΑΧΕΙΡΙΣΤΗ', 'CREATED', 'BUILDING ID', 'BEP/FB CODE', 'BEP/FB PORT', 'BEP/FB TYPE']],
-                              merged_new_flow[['SR ID', 'sr_created', 'FIELDTASKTYPE', 'FIELDTASKSTATUS', 'full_adr', 'AGE', 'pilot', 'customer', 'mobile', 'Τύπος εργασίας', 'Ημ/νία Αίτησης', 'Όνομα', 'Τεχνικός σε Ανάθεση (KAM)', 'Κατάσταση', 'Ημερομηνία Ολοκλήρωσης', 'Τ.Τ.Λ.Π.', 'Διεύθυνση πελάτη', 'Αριθμός Οδού', 'Έναρξη Ραντεβού', 'Έγκριση Εργασίας', 'Κατηγορία Αιτήματος', 'building Id']]], ignore_index=True)
-        final_df = pd.concat([merged_construction[['SR ID', 'Τύπος εργασίας', 'Ημ/νία Αίτησης', 'Όνομα', 'Τεχνικός σε Ανάθεση (KAM)', 'Κατάσταση', 'Ημερομηνία Ολοκλήρωσης', 'Τ.Τ.Λ.Π.', 'Διεύθυνση πελάτη', 'Αριθμός Οδού', 'Έναρξη Ραντεβού', 'Έγκριση Εργασίας', 'Κατηγορία Αιτήματος', 'TYPE', 'ΤΗΛΕΦΩΝΟ ΠΑΡΑΓΓΕΛΙΑΣ', 'ADDRESS', 'FLOOR', 'PILOT', 'A/K', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ', 'AGE', 'ΚΙΝΗΤΟ ΠΕΛΑΤΗ', 'ΣΤΑΘΕΡΟ ΠΕΛΑΤΗ', 'E-MAIL ΠΕΛΑΤΗ', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΚΙΝΗΤΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΣΤΑΘΕΡΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'E-MAIL ΔΙΑΧΕΙΡΙΣΤΗ', 'CREATED', 'BUILDING ID', 'BEP/FB CODE', 'BEP/FB PORT', 'BEP/FB TYPE']],
-                              merged_inspection[['SR ID', 'Τύπος εργασίας', 'Ημ/νία Αίτησης', 'Όνομα', 'Τεχνικός σε Ανάθεση (KAM)', 'Κατάσταση', 'Ημερομηνία Ολοκλήρωσης', 'Τ.Τ.Λ.Π.', 'Διεύθυνση πελάτη', 'Αριθμός Οδού', 'Έναρξη Ραντεβού', 'Έγκριση Εργασίας', 'Κατηγορία Αιτήματος', 'TYPE', 'ΤΗΛΕΦΩΝΟ ΠΑΡΑΓΓΕΛΙΑΣ', 'ADDRESS', 'FLOOR', 'PILOT', 'A/K', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ', 'AGE', 'ΚΙΝΗΤΟ ΠΕΛΑΤΗ', 'ΣΤΑΘΕΡΟ ΠΕΛΑΤΗ', 'E-MAIL ΠΕΛΑΤΗ', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΚΙΝΗΤΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΣΤΑΘΕΡΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'E-MAIL ΔΙΑΧΕΙΡΙΣΤΗ', 'CREATED', 'BUILDING ID', 'BEP/FB CODE', 'BEP/FB PORT', 'BEP/FB TYPE']],
-                              merged_bid[['SR ID', 'Τύπος εργασίας', 'Ημ/νία Αίτησης', 'Όνομα', 'Τεχνικός σε Ανάθεση (KAM)', 'Κατάσταση', 'Ημερομηνία Ολοκλήρωσης', 'Τ.Τ.Λ.Π.', 'Διεύθυνση πελάτη', 'Αριθμός Οδού', 'Έναρξη Ραντεβού', 'Έγκριση Εργασίας', 'Κατηγορία Αιτήματος', 'TYPE', 'ΤΗΛΕΦΩΝΟ ΠΑΡΑΓΓΕΛΙΑΣ', 'ADDRESS', 'FLOOR', 'PILOT', 'A/K', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ', 'AGE', 'ΚΙΝΗΤΟ ΠΕΛΑΤΗ', 'ΣΤΑΘΕΡΟ ΠΕΛΑΤΗ', 'E-MAIL ΠΕΛΑΤΗ', 'ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΚΙΝΗΤΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'ΣΤΑΘΕΡΟ ΔΙΑΧΕΙΡΙΣΤΗ', 'E-MAIL ΔΙΑΧΕΙΡΙΣΤΗ', 'CREATED', 'BUILDING ID', 'BEP/FB CODE', 'BEP/FB PORT', 'BEP/FB TYPE']],
-                              merged_new_flow[['SR ID', 'sr_created', 'FIELDTASKTYPE', 'FIELDTASKSTATUS', 'full_adr', 'AGE', 'pilot', 'customer', 'mobile', 'Τύπος εργασίας', 'Ημ/νία Αίτησης', 'Όνομα', 'Τεχνικός σε Ανάθεση (KAM)', 'Κατάσταση', 'Ημερομηνία Ολοκλήρωσης', 'Τ.Τ.Λ.Π.', 'Διεύθυνση πελάτη', 'Αριθμός Οδού', 'Έναρξη Ραντεβού', 'Έγκριση Εργασίας', 'Κατηγορία Αιτήματος', 'building Id']]], ignore_index=True)
-    
-        # Remove duplicate entries based on 'SR ID' and 'Τύπος εργασίας' columns, keeping the latest date
-        data_df['Ημ/νία Αίτησης'] = pd.to_datetime(data_df['Ημ/νία Αίτησης'])
-        data_df = data_df.sort_values('Ημ/νία Αίτησης').drop_duplicates(subset=['SR ID', 'Τύπος εργασίας'], keep='last')
-
-        #Create the Last drop sheet
-        last_drop_rows = []
-        unique_sr_idsLD = final_df['SR ID'].unique()
-        for ld_sr_id in unique_sr_idsLD:
-            if not final_df[final_df['SR ID'] == ld_sr_id]['sr_created'].isna().values[0]: #Making sure to pass only the last drop entries
-                rowLS = {}
-                rowLS['SR ID'] = ld_sr_id
-                pilot1_df = final_df[final_df['SR ID'] == ld_sr_id]['PILOT']
-                pilot2_df = final_df[final_df['SR ID'] == ld_sr_id]['pilot']
-                if not pilot1_df.empty and not pilot1_df.isna().values[0]:
-                    rowLS['PILOT'] = final_df[final_df['SR ID'] == ld_sr_id]['PILOT'].values[0]
-                elif not pilot2_df.empty:
-                    rowLS['PILOT'] = final_df[final_df['SR ID'] == ld_sr_id]['pilot'].values[0]
-                else:
-                    rowLS['PILOT'] = None 
-                buildin1_df_ld = final_df[final_df['SR ID'] == ld_sr_id]['BUILDING ID']
-                buildin2_df_ld = final_df[final_df['SR ID'] == ld_sr_id]['building Id']
-                if not buildin1_df_ld.empty and not buildin1_df_ld.isna().values[0]:
-                    rowLS['BUILDING ID'] = final_df[final_df['SR ID'] == ld_sr_id]['BUILDING ID'].values[0]
-                elif not buildin2_df_ld.empty :
-                    rowLS['BUILDING ID'] = final_df[final_df['SR ID'] == ld_sr_id]['building Id'].values[0]
-                else:
-                    rowLS['BUILDING ID'] = None
-                adress1_df_ld = final_df[final_df['SR ID'] == ld_sr_id]['ADDRESS']
-                adress2_df_ld = final_df[final_df['SR ID'] == ld_sr_id]['full_adr']
-                if not adress1_df_ld.empty and not adress1_df_ld.isna().values[0]:
-                    rowLS['ADDRESS'] = final_df[final_df['SR ID'] == ld_sr_id]['ADDRESS'].values[0]
-                elif not adress2_df_ld.empty:
-                    rowLS['ADDRESS'] = final_df[final_df['SR ID'] == ld_sr_id]['full_adr'].values[0]
-                else:
-                    rowLS['ADDRESS'] = None                        
-                rowLS['FLOOR'] = final_df[final_df['SR ID'] == ld_sr_id]['FLOOR'].values[0]
-                age_df_ld = final_df[final_df['SR ID'] == ld_sr_id]['AGE']
-                AGE_df_ld = final_df[final_df['SR ID'] == ld_sr_id]['AGE']
-                if not age_df_ld.empty and not age_df_ld.isna().values[0]:
-                    rowLS['AGE'] = final_df[final_df['SR ID'] == ld_sr_id]['AGE'].values[0]
-                elif not AGE_df_ld.empty:
-                    rowLS['AGE'] = final_df[final_df['SR ID'] == ld_sr_id]['AGE'].values[0]
-                else:
-                    rowLS['AGE'] = None            
-                rowLS['Ημερομηνία Εκτέλεσης (As-built)'] = final_df[final_df['SR ID'] == ld_sr_id]['sr_created'].values[0]
-                rowLS['Όνομα'] = df1[df1['SR ID'] == ld_sr_id]['Όνομα'].values[0]
-                rowLS['Τεχνικός σε Ανάθεση (KAM)'] = df1[df1['SR ID'] == ld_sr_id]['Τεχνικός σε Ανάθεση (KAM)'].values[0]
-                rowLS['Pilot/Last drop'] = final_df[final_df['SR ID'] == ld_sr_id]['FIELDTASKTYPE'].values[0]
-                rowLS['Κατάσταση (As-built)'] = final_df[final_df['SR ID'] == ld_sr_id]['FIELDTASKSTATUS'].values[0]
-                rowLS['As-built/Απολογισμός'] = None
-                customer1_df_ld = final_df[final_df['SR ID'] == ld_sr_id]['ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ']
-                customer2_df_ld = final_df[final_df['SR ID'] == ld_sr_id]['customer']
-                if not customer1_df_ld.empty and not customer1_df_ld.isna().values[0]:
-                    rowLS['ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ'] = final_df[final_df['SR ID'] == ld_sr_id]['ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ'].values[0]
-                elif not customer2_df_ld.empty:
-                    rowLS['ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ'] = final_df[final_df['SR ID'] == ld_sr_id]['customer'].values[0]
-                else:
-                    rowLS['ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ'] = None 
-                customertel1_df_ld = final_df[final_df['SR ID'] == ld_sr_id]['ΚΙΝΗΤΟ ΠΕΛΑΤΗ']
-                customertel2_df_ld = final_df[final_df['SR ID'] == ld_sr_id]['mobile']
-                if not customertel1_df_ld.empty and not customertel1_df_ld.isna().values[0]:
-                    rowLS['ΚΙΝΗΤΟ ΠΕΛΑΤΗ'] = final_df[final_df['SR ID'] == ld_sr_id]['ΚΙΝΗΤΟ ΠΕΛΑΤΗ'].values[0]
-                elif not customertel2_df_ld.empty:
-                    rowLS['ΚΙΝΗΤΟ ΠΕΛΑΤΗ'] = final_df[final_df['SR ID'] == ld_sr_id]['mobile'].values[0]
-                else:
-                    rowLS['ΚΙΝΗΤΟ ΠΕΛΑΤΗ'] = None
-                last_drop_rows.append(rowLS)
-
-        last_drop_df = pd.DataFrame(last_drop_rows)
-      
-        # Create a summary DataFrame
-        summary_rows = []
-        unique_sr_ids = final_df['SR ID'].unique()
-        for sr_id in unique_sr_ids:
-            #print(final_df['sr_created'])
-            if final_df[final_df['SR ID'] == sr_id]['sr_created'].isna().values[0]: #Making sure to pass only the non-last drop entries
-                row = {}
-                row['SR ID'] = sr_id
-                buildin1_df = final_df[final_df['SR ID'] == sr_id]['BUILDING ID']
-                buildin2_df = final_df[final_df['SR ID'] == sr_id]['building Id']
-                if not buildin1_df.empty and not buildin1_df.isna().values[0]:
-                    row['BUILDING ID'] = final_df[final_df['SR ID'] == sr_id]['BUILDING ID'].values[0]
-                elif not buildin2_df.empty :
-                    row['BUILDING ID'] = final_df[final_df['SR ID'] == sr_id]['building Id'].values[0]
-                else:
-                    row['BUILDING ID'] = None
-                adress1_df = final_df[final_df['SR ID'] == sr_id]['ADDRESS']
-                adress2_df = final_df[final_df['SR ID'] == sr_id]['full_adr']
-                if not adress1_df.empty and not adress1_df.isna().values[0]:
-                    row['ADDRESS'] = final_df[final_df['SR ID'] == sr_id]['ADDRESS'].values[0]
-                elif not adress2_df.empty:
-                    row['ADDRESS'] = final_df[final_df['SR ID'] == sr_id]['full_adr'].values[0]
-                else:
-                    row['ADDRESS'] = None                        
-                row['FLOOR'] = final_df[final_df['SR ID'] == sr_id]['FLOOR'].values[0]
-                row['A/K'] = final_df[final_df['SR ID'] == sr_id]['A/K'].values[0]
-                age_df = final_df[final_df['SR ID'] == sr_id]['AGE']
-                AGE_df = final_df[final_df['SR ID'] == sr_id]['AGE']
-                if not age_df.empty and not age_df.isna().values[0]:
-                    row['AGE'] = final_df[final_df['SR ID'] == sr_id]['AGE'].values[0]
-                elif not AGE_df.empty:
-                    row['AGE'] = final_df[final_df['SR ID'] == sr_id]['AGE'].values[0]
-                else:
-                    row['AGE'] = None            
-                row['CREATED'] = final_df[final_df['SR ID'] == sr_id]['CREATED'].values[0]
-                row['Όνομα'] = df1[df1['SR ID'] == sr_id]['Όνομα'].values[0]
-                row['Τεχνικός σε Ανάθεση (KAM)'] = df1[df1['SR ID'] == sr_id]['Τεχνικός σε Ανάθεση (KAM)'].values[0]
-                autopsia_df = final_df[(final_df['SR ID'] == sr_id) & (final_df['Τύπος εργασίας'] == 'ΑΥΤΟΨΙΑ FTTH')]
-                if not autopsia_df.empty:
-                    row['Ημ/νία Αίτησης (ΑΥΤΟΨΙΑ)'] = autopsia_df['Ημ/νία Αίτησης'].max()
-                    row['Τύπος εργασίας (ΑΥΤΟΨΙΑ)'] = autopsia_df[autopsia_df['Ημ/νία Αίτησης'] == row['Ημ/νία Αίτησης (ΑΥΤΟΨΙΑ)']]['Τύπος εργασίας'].values[0]
-                    row['Κατάσταση (ΑΥΤΟΨΙΑ)'] = autopsia_df[autopsia_df['Ημ/νία Αίτησης'] == row['Ημ/νία Αίτησης (ΑΥΤΟΨΙΑ)']]['Κατάσταση'].values[0]
-                else:
-                    row['Ημ/νία Αίτησης (ΑΥΤΟΨΙΑ)'] = None
-                    row['Τύπος εργασίας (ΑΥΤΟΨΙΑ)'] = None
-                    row['Κατάσταση (ΑΥΤΟΨΙΑ)'] = None
-                kataskevi_df = final_df[(final_df['SR ID'] == sr_id) & (final_df['Τύπος εργασίας'] == 'ΚΑΤΑΣΚΕΥΗ FTTH')]
-                if not kataskevi_df.empty:
-                    row['Ημ/νία Αίτησης (ΚΑΤΑΣΚΕΥΗ)'] = kataskevi_df['Ημ/νία Αίτησης'].max()
-                    row['Τύπος εργασίας (ΚΑΤΑΣΚΕΥΗ)'] = kataskevi_df[kataskevi_df['Ημ/νία Αίτησης'] == row['Ημ/νία Αίτησης (ΚΑΤΑΣΚΕΥΗ)']]['Τύπος εργασίας'].values[0]
-                    row['Κατάσταση (ΚΑΤΑΣΚΕΥΗ)'] = kataskevi_df[(kataskevi_df['Ημ/νία Αίτησης'] == row['Ημ/νία Αίτησης (ΚΑΤΑΣΚΕΥΗ)'])]['Κατάσταση'].values[0]
-                else:
-                    row['Ημ/νία Αίτησης (ΚΑΤΑΣΚΕΥΗ)'] = None
-                    row['Τύπος εργασίας (ΚΑΤΑΣΚΕΥΗ)'] = None
-                    row['Κατάσταση (ΚΑΤΑΣΚΕΥΗ)'] = None
-                row['Ημερομηνία Εκτέλεσης (Χωματουργικές Εργασίες)'] = None
-                row['Κατάσταση (Χωματουργικές Εργασίες)'] = None
-                row['Ημερομηνία Εκτέλεσης (Δικτυακές Εργασίες)'] = None
-                row['Δικτυακές Εργασίες'] = None
-                row['Κατάσταση (Δικτυακές Εργασίες)'] = None
-                # Here was the Pilot/As build and Last drop info
-                row['Κατηγορία Αιτήματος'] = final_df[final_df['SR ID'] == sr_id]['Κατηγορία Αιτήματος'].values[0]
-                row['ΤΗΛΕΦΩΝΟ ΠΑΡΑΓΓΕΛΙΑΣ'] = final_df[final_df['SR ID'] == sr_id]['ΤΗΛΕΦΩΝΟ ΠΑΡΑΓΓΕΛΙΑΣ'].values[0]
-                customer1_df = final_df[final_df['SR ID'] == sr_id]['ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ']
-                customer2_df = final_df[final_df['SR ID'] == sr_id]['customer']
-                if not customer1_df.empty and not customer1_df.isna().values[0]:
-                    row['ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ'] = final_df[final_df['SR ID'] == sr_id]['ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ'].values[0]
-                elif not customer2_df.empty:
-                    row['ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ'] = final_df[final_df['SR ID'] == sr_id]['customer'].values[0]
-                else:
-                    row['ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΠΕΛΑΤΗ'] = None 
-                customertel1_df = final_df[final_df['SR ID'] == sr_id]['ΚΙΝΗΤΟ ΠΕΛΑΤΗ']
-                customertel2_df = final_df[final_df['SR ID'] == sr_id]['mobile']
-                if not customertel1_df.empty and not customertel1_df.isna().values[0]:
-                    row['ΚΙΝΗΤΟ ΠΕΛΑΤΗ'] = final_df[final_df['SR ID'] == sr_id]['ΚΙΝΗΤΟ ΠΕΛΑΤΗ'].values[0]
-                elif not customertel2_df.empty:
-                    row['ΚΙΝΗΤΟ ΠΕΛΑΤΗ'] = final_df[final_df['SR ID'] == sr_id]['mobile'].values[0]
-                else:
-                    row['ΚΙΝΗΤΟ ΠΕΛΑΤΗ'] = None
-                row['ΣΤΑΘΕΡΟ ΠΕΛΑΤΗ'] = final_df[final_df['SR ID'] == sr_id]['ΣΤΑΘΕΡΟ ΠΕΛΑΤΗ'].values[0]
-                row['ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΔΙΑΧΕΙΡΙΣΤΗ'] = final_df[final_df['SR ID'] == sr_id]['ΌΝΟΜΑΤΕΠΩΝΥΜΟ ΔΙΑΧΕΙΡΙΣΤΗ'].values[0]
-                row['ΚΙΝΗΤΟ ΔΙΑΧΕΙΡΙΣΤΗ'] = final_df[final_df['SR ID'] == sr_id]['ΚΙΝΗΤΟ ΔΙΑΧΕΙΡΙΣΤΗ'].values[0]
-                row['ΣΤΑΘΕΡΟ ΔΙΑΧΕΙΡΙΣΤΗ'] = final_df[final_df['SR ID'] == sr_id]['ΣΤΑΘΕΡΟ ΔΙΑΧΕΙΡΙΣΤΗ'].values[0]
-                row['BEP/FB CODE'] = final_df[final_df['SR ID'] == sr_id]['BEP/FB CODE'].values[0]
-                row['BEP/FB PORT'] = final_df[final_df['SR ID'] == sr_id]['BEP/FB PORT'].values[0]
-                row['BEP/FB TYPE'] = final_df[final_df['SR ID'] == sr_id]['BEP/FB TYPE'].values[0]
-
-                summary_rows.append(row)
-
-        summary_df = pd.DataFrame(summary_rows)
+        # The IDs are written as numbers where they are whole numbers, as they were read
+        data_df, summary_df, last_drop_df = [schema.ids_to_values(df) for df in sheets]
 
         # Save the final DataFrame and the summary DataFrame to the specified output folder
-        with pd.ExcelWriter(f'{output_folder}/final_results.xlsx') as writer:
-            data_df.to_excel(writer, sheet_name='Aggregated Data', index=False)
-            summary_df.to_excel(writer, sheet_name='Summary of Actions', index=False)
-            last_drop_df.to_excel(writer, sheet_name='Last Drop', index=False)
+        with report.stage('write') as stage:
+            paths = output_writer.write_results(data_df, summary_df, last_drop_df, output_folder, output_formats, streaming_output)
+            stage['rows'] = len(data_df) + len(summary_df) + len(last_drop_df)
+        report.info['outputs'] = paths
         
-        print("Data saved to final_results.xlsx")
+        print(f"Data saved to {', '.join(os.path.basename(path) for path in paths)}")
+        return True
+
+def main(file_path1, file_path2, sheet_name, output_folder, engine=None, use_cache=True, incremental=False, streaming=False,
+         output_formats=('xlsx',), streaming_output=False, trace_memory=False, profile=False, read_workers=None):
+    # Returns True if the results were written, False if no SR ID matched. Either way a run_report.json
+    # with the time, memory and rows of every stage is written to output_folder
+    report = run_report.RunReport(trace_memory, os.path.join(output_folder, 'profiles') if profile else None)
+    options = {'engine': engine, 'use_cache': use_cache, 'incremental': incremental, 'streaming': streaming,
+               'output_formats': list(output_formats), 'streaming_output': streaming_output, 'read_workers': read_workers}
+    report.info.update(inputs={'file_path1': file_path1, 'file_path2': file_path2, 'sheet_name': sheet_name}, options=options)
+    try:
+        found = process_files(file_path1, file_path2, sheet_name, output_folder, report, **options)
+    except Exception as e:
+        report.info.update(status='failed', error=f'{type(e).__name__}: {e}')
+        report.save(output_folder)
+        raise
+    report.info['status'] = 'ok' if found else 'nothing_found'
+    report.save(output_folder)
+    return found
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Merge and summarize the two Excel exports based on SR ID.")
+    parser.add_argument('file_path1', nargs='?', help="First Excel file")
+    parser.add_argument('file_path2', nargs='?', help="Second Excel file")
+    parser.add_argument('sheet_name', nargs='?', help="Sheet of the first Excel file to read")
+    parser.add_argument('output_folder', nargs='?', help="Folder to write final_results.xlsx to")
+    parser.add_argument('--engine', help="Excel reader engine, e.g. openpyxl or calamine")
+    parser.add_argument('--read-workers', type=int, help="Worker processes parsing the sheets of the second file, each opening the workbook itself (default: parse them all from one open workbook in this process)")
+    parser.add_argument('--no-cache', action='store_true', help="Always parse the Excel files, bypassing the sheet cache")
+    parser.add_argument('--clear-cache', action='store_true', help="Remove all cached sheets")
+    parser.add_argument('--streaming', action='store_true', help="Stream the second Excel file row by row, keeping only the SR IDs of the first file")
+    parser.add_argument('--incremental', action='store_true', help="Only reprocess the SR IDs that changed since the previous incremental run into output_folder")
+    parser.add_argument('--output-format', nargs='+', choices=output_writer.FORMATS, default=['xlsx'], help="Output formats to write (default: xlsx)")
+    parser.add_argument('--streaming-output', action='store_true', help="Write the Excel output row by row in constant memory")
+    parser.add_argument('--trace-memory', action='store_true', help="Also record the tracemalloc peak of every stage in the run report (slower)")
+    parser.add_argument('--profile', action='store_true', help="Save a cProfile dump of every stage to output_folder/profiles")
+    args = parser.parse_args()
+
+    if args.read_workers is not None and args.read_workers < 1:
+        parser.error("--read-workers must be at least 1")
+    if args.clear_cache:
+        print(f"Removed {sheet_cache.clear()} cached sheets")
+    if args.file_path1:
+        if not (args.file_path2 and args.sheet_name and args.output_folder):
+            parser.error("file_path1, file_path2, sheet_name and output_folder are all required")
+        main(args.file_path1, args.file_path2, args.sheet_name, args.output_folder, engine=args.engine, use_cache=not args.no_cache, incremental=args.incremental, streaming=args.streaming,
+             output_formats=args.output_format, streaming_output=args.streaming_output, trace_memory=args.trace_memory, profile=args.profile,
+             read_workers=args.read_workers)
+    elif not args.clear_cache:
+        parser.print_usage()
\ No newline at end of file
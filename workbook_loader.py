@@ -0,0 +1,142 @@
+# Description: Loads the input Excel workbooks. The requested sheets are parsed from one open
+# workbook, or on request in parallel worker processes, unless they are already in the sheet
+# cache. Large sheets can instead be streamed row by row, keeping only the rows of the wanted
+# SR IDs.
+
+import importlib.util
+import os
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from openpyxl import load_workbook
+from pandas.io.parsers import TextParser
+
+import schema
+import sheet_cache
+
+def pick_engine(engine=None):
+    # An explicit engine wins; otherwise prefer the native calamine reader when python-calamine
+    # is installed and let pandas pick its default (openpyxl for .xlsx, xlrd for .xls)
+    if engine:
+        return engine
+    if importlib.util.find_spec('python_calamine') is not None:
+        return 'calamine'
+    return None
+
+def get_sheet_names(file_path):
+    # For .xlsx/.xlsm only the small workbook.xml part is read, instead of loading the whole
+    # workbook; other formats (.xlsb and .ods are zip archives too) are left to pandas
+    if os.path.splitext(file_path)[1].lower() in ('.xlsx', '.xlsm') and zipfile.is_zipfile(file_path):
+        with zipfile.ZipFile(file_path) as archive:
+            try:
+                root = ET.fromstring(archive.read('xl/workbook.xml'))
+            except KeyError:
+                root = None
+        if root is not None:
+            return [sheet.get('name') for sheet in root.iter() if sheet.tag.endswith('}sheet')]
+    with pd.ExcelFile(file_path) as xls:
+        return xls.sheet_names
+
+def parse_sheet(xls, sheet_name, usecols, sheet_schema=None):
+    df = xls.parse(sheet_name, usecols=usecols)
+    return schema.apply_schema(df, sheet_schema) if sheet_schema else df
+
+def parse_workbook_sheet(file_path, sheet_name, usecols, engine=None, sheet_schema=None):
+    # Runs in a worker process, which opens the workbook itself (read-only for openpyxl)
+    with pd.ExcelFile(file_path, engine=engine) as xls:
+        return parse_sheet(xls, sheet_name, usecols, sheet_schema)
+
+def parse_sheets(file_path, sheets, engine=None, max_workers=None, schemas=None):
+    # sheets maps each sheet name to its usecols and schemas to its schema.py schema;
+    # returns the parsed DataFrames under the same names. By default the workbook is opened once
+    # and its sheets parsed one after another; with max_workers the sheets are parsed in worker
+    # processes, each of which opens the workbook again (shared strings included) and holds its
+    # own copy of it, which costs memory and only pays off with several cores
+    schemas = schemas or {}
+    workers = min(max_workers or 1, len(sheets))
+    if workers <= 1:
+        with pd.ExcelFile(file_path, engine=engine) as xls:
+            return {sheet_name: parse_sheet(xls, sheet_name, usecols, schemas.get(sheet_name)) for sheet_name, usecols in sheets.items()}
+
+    # The openpyxl parser holds the GIL, so threads would parse one sheet at a time; separate
+    # processes parse the sheets on separate cores
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {sheet_name: executor.submit(parse_workbook_sheet, file_path, sheet_name, usecols, engine, schemas.get(sheet_name)) for sheet_name, usecols in sheets.items()}
+        return {sheet_name: future.result() for sheet_name, future in futures.items()}
+
+def read_sheets(file_path, sheets, engine=None, max_workers=None, use_cache=True, schemas=None):
+    # Like parse_sheets, but sheets already parsed in an earlier run are taken from the sheet cache
+    engine = pick_engine(engine)
+    schemas = schemas or {}
+    if not use_cache:
+        return parse_sheets(file_path, sheets, engine, max_workers, schemas)
+
+    workbook_key = sheet_cache.file_key(file_path)
+    keys = {sheet_name: sheet_cache.entry_key(workbook_key, sheet_name, usecols, engine, schemas.get(sheet_name)) for sheet_name, usecols in sheets.items()}
+    frames = {}
+    for sheet_name in sheets:
+        df = sheet_cache.load(keys[sheet_name])
+        if df is not None:
+            frames[sheet_name] = df
+
+    missing = {sheet_name: usecols for sheet_name, usecols in sheets.items() if sheet_name not in frames}
+    if missing:
+        for sheet_name, df in parse_sheets(file_path, missing, engine, max_workers, schemas).items():
+            sheet_cache.store(keys[sheet_name], df)
+            frames[sheet_name] = df
+
+    return {sheet_name: frames[sheet_name] for sheet_name in sheets}
+
+def convert_cell(value):
+    # Same conversion pandas applies to openpyxl cells, so streamed sheets parse like read_excel
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def cell_id(value):
+    # The ID a cell becomes on the default path, where the parser turns text that looks like a
+    # number into that number ('00123' -> 123) before schema.to_id
+    value = convert_cell(value)
+    if isinstance(value, str):
+        for number in (int, float):
+            try:
+                return schema.id_text(number(value))
+            except ValueError:
+                pass
+    return schema.id_text(value)
+
+def stream_sheets(file_path, sheets, sr_ids, schemas=None):
+    # Reads the given {sheet name: usecols} sheets row by row, keeping only the usecols of the rows
+    # whose 'SR ID' is in sr_ids, so memory depends on the number of matches, not the sheet size
+    wanted = {str(sr_id) for sr_id in sr_ids}
+    schemas = schemas or {}
+    workbook = load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        frames = {}
+        for sheet_name, usecols in sheets.items():
+            worksheet = workbook[sheet_name]
+            # Some exporters write a stale <dimension> tag, which would end the read-only rows early
+            worksheet.reset_dimensions()
+            rows = worksheet.iter_rows(values_only=True)
+            header = [convert_cell(value) for value in next(rows, ())]
+            missing = [column for column in usecols if column not in header]
+            if missing:
+                raise ValueError(f"Usecols do not match columns in sheet '{sheet_name}', columns expected but not found: {missing}")
+            positions = [i for i, column in enumerate(header) if column in usecols]
+            sr_id_position = header.index('SR ID')
+
+            data = [[header[i] for i in positions]]
+            for row in rows:
+                # The text itself is also tried, for text IDs the parser leaves as text
+                if sr_id_position < len(row) and (cell_id(row[sr_id_position]) in wanted or str(convert_cell(row[sr_id_position])) in wanted):
+                    data.append([convert_cell(row[i]) if i < len(row) else '' for i in positions])
+            with TextParser(data, header=0) as parser:
+                df = parser.read()
+            frames[sheet_name] = schema.apply_schema(df, schemas[sheet_name]) if sheet_name in schemas else df
+        return frames
+    finally:
+        workbook.close()